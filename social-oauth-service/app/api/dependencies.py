@@ -0,0 +1,64 @@
+"""
+Shared FastAPI dependencies
+"""
+from fastapi import HTTPException, Header, Request
+from dataclasses import dataclass, field
+from typing import List, Optional
+from cachetools import TTLCache
+
+from app.database import db
+from app.scheduler.maintenance import record_api_key_use
+
+# Recently rejected API keys, so repeated bad keys don't reach the database.
+# Only touched from the event loop thread, so no lock is needed.
+_bad_keys = TTLCache(maxsize=4096, ttl=60)
+
+
+@dataclass
+class ApiKeyPrincipal:
+    """Caller identified by a validated service API key"""
+    api_key: str
+    is_active: bool
+    scopes: List[str] = field(default_factory=list)
+
+
+async def verify_api_key(request: Request, x_api_key: Optional[str] = Header(None)) -> ApiKeyPrincipal:
+    """
+    Verify service-to-service API key
+    
+    FastAPI caches the result per request, so other dependencies can take
+    Depends(verify_api_key) without another database lookup. The principal
+    is also stored on request.state.principal.
+    
+    Returns:
+        ApiKeyPrincipal for the caller
+    """
+    if not x_api_key:
+        raise HTTPException(status_code=401, detail="API key required")
+    
+    if x_api_key in _bad_keys:
+        raise HTTPException(status_code=401, detail="Invalid API key")
+    
+    # Check if API key is valid
+    key_row = db.execute_one(
+        "SELECT is_active, scopes FROM service_api_keys WHERE api_key = %s",
+        (x_api_key,),
+        cursor_factory=None
+    )
+    
+    if not key_row or not key_row[0]:
+        _bad_keys[x_api_key] = True
+        raise HTTPException(status_code=401, detail="Invalid API key")
+    
+    is_active, scopes = key_row
+    
+    # Update last used timestamp (flushed in batches)
+    record_api_key_use(x_api_key)
+    
+    principal = ApiKeyPrincipal(
+        api_key=x_api_key,
+        is_active=is_active,
+        scopes=scopes or []
+    )
+    request.state.principal = principal
+    return principal
@@ -30,7 +30,7 @@ async def health_check():
     
     # Check database
     try:
-        db_healthy = db.test_connection()
+        db_healthy = db.is_healthy()
         health_status["components"]["database"] = {
             "status": "healthy" if db_healthy else "unhealthy",
             "type": "postgresql"
@@ -59,7 +59,7 @@ async def readiness_check():
     Returns 200 if service is ready to accept requests
     """
     try:
-        if not db.test_connection():
+        if not db.is_healthy():
             return {"ready": False, "reason": "database_unavailable"}
         
         return {"ready": True}
@@ -58,12 +58,12 @@ async def initiate_oauth(platform: str, request: AuthorizeRequest):
         if provider.requires_pkce() and code_verifier:
             # Get code_challenge from database (stored by generate_state_token)
             from app.database import db
-            result = db.execute_query(
+            state = db.execute_one(
                 "SELECT code_challenge FROM oauth_states WHERE state_token = %s",
                 (state_token,)
             )
-            if result and len(result) > 0:
-                kwargs['code_challenge'] = result[0]['code_challenge']
+            if state:
+                kwargs['code_challenge'] = state['code_challenge']
                 logger.info(f"Retrieved code_challenge for {platform} PKCE flow")
         
         # Get authorization URL
@@ -145,13 +145,13 @@ async def oauth_callback(
             raise ValueError("Invalid or expired state token")
         
         # Exchange code for tokens
-        token_data = provider.exchange_code_for_token(
+        token_data = await provider.aexchange_code_for_token(
             code,
             code_verifier=code_verifier
         )
         
         # Get user info
-        user_info = provider.get_user_info(token_data['access_token'])
+        user_info = await provider.aget_user_info(token_data['access_token'])
         
         # Save connection
         connection = provider.save_connection(brand_id, token_data, user_info)
@@ -304,13 +304,13 @@ async def oauth_callback_old(
             raise ValueError("Invalid or expired state token")
         
         # Exchange code for tokens
-        token_data = provider.exchange_code_for_token(
+        token_data = await provider.aexchange_code_for_token(
             code,
             code_verifier=code_verifier
         )
         
         # Get user info
-        user_info = provider.get_user_info(token_data['access_token'])
+        user_info = await provider.aget_user_info(token_data['access_token'])
         
         # Save connection
         connection = provider.save_connection(brand_id, token_data, user_info)
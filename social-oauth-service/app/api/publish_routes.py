@@ -314,6 +314,10 @@ async def publish_post(request: PublishRequest):
                         logger.info(f"✅ Using OAuth 1.0a credentials for Twitter media upload")
                     else:
                         logger.warning(f"⚠️ No OAuth 1.0a credentials found for Twitter. Media uploads may fail with 403 error.")
+                    
+                    # Media that needs processing (video) is tweeted in the background; the publisher records the result
+                    kwargs['defer_processing'] = True
+                    kwargs['brand_id'] = request.brand_id
                 
                 # Publish post
                 result = publisher.publish_with_retry(
@@ -323,6 +327,15 @@ async def publish_post(request: PublishRequest):
                     **kwargs
                 )
                 
+                if result.get('status') == 'processing':
+                    results[platform] = {
+                        "success": True,
+                        "job_id": result['job_id'],
+                        "status": "processing"
+                    }
+                    logger.info(f"Queued {platform} post for brand {request.brand_id} until media {result['job_id']} is processed")
+                    continue
+                
                 # Record success
                 publisher.record_publish_result(
                     brand_id=request.brand_id,
@@ -587,7 +600,7 @@ async def get_post_status(post_id: int):
         Post status and metrics
     """
     try:
-        result = db.execute_query(
+        post = db.execute_one(
             """
             SELECT * FROM post_history
             WHERE id = %s
@@ -595,11 +608,9 @@ async def get_post_status(post_id: int):
             (post_id,)
         )
         
-        if not result or len(result) == 0:
+        if not post:
             raise HTTPException(status_code=404, detail="Post not found")
         
-        post = dict(result[0])
-        
         return {
             "success": True,
             "post_id": post['id'],
@@ -22,16 +22,34 @@ class Settings(BaseSettings):
     DB_NAME: str = "oauth_db"
     DB_USER: str = "postgres"
     DB_PASSWORD: str = "oauth_pass"
+    DB_POOL_MIN_CONN: int = 1
+    # Connections are shared by FastAPI's sync threadpool (40 threads) and the background loops;
+    # callers beyond this wait up to DB_POOL_ACQUIRE_TIMEOUT_SECONDS for a free connection.
+    # Keep it below Postgres max_connections divided by the number of workers.
+    DB_POOL_MAX_CONN: int = 10
+    DB_POOL_ACQUIRE_TIMEOUT_SECONDS: float = 30
+    DB_HEALTH_CACHE_SECONDS: int = 5
+    # Prepared statements kept per connection; set to 0 behind PgBouncer transaction pooling
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 64
     
     # Redis (for job queue)
     REDIS_URL: str = "redis://localhost:6379"
     REDIS_DB: int = 0
     
+    # Connection cache (decrypted connections kept per worker)
+    CONNECTION_CACHE_TTL_SECONDS: int = 30
+    # Broadcast cache invalidations over Redis pub/sub (multi-worker deployments)
+    CONNECTION_CACHE_REDIS_INVALIDATION: bool = False
+    
     # Security
     ENCRYPTION_KEY: str  # Required - Fernet encryption key
     SERVICE_API_KEY: str = "dev-service-key-change-in-production"
     SECRET_KEY: str = "your-secret-key-change-in-production"
     
+    # CORS (comma-separated origins, plus an optional origin regex)
+    CORS_ORIGINS: str = "http://localhost:8000,http://localhost:8001"
+    CORS_ORIGIN_REGEX: Optional[str] = None
+    
     # OAuth Callback URLs (base URL for redirects)
     BASE_CALLBACK_URL: str = "http://localhost:8001"
     
@@ -45,6 +63,7 @@ class Settings(BaseSettings):
     CLOUDINARY_CLOUD_NAME: Optional[str] = None
     CLOUDINARY_API_KEY: Optional[str] = None
     CLOUDINARY_API_SECRET: Optional[str] = None
+    CLOUDINARY_MAX_CONCURRENCY: int = 8  # Concurrent uploads per worker
     
     # Instagram/Facebook OAuth (Meta)
     INSTAGRAM_CLIENT_ID: Optional[str] = None
@@ -55,6 +74,10 @@ class Settings(BaseSettings):
     FACEBOOK_CLIENT_SECRET: Optional[str] = None
     FACEBOOK_REDIRECT_URI: Optional[str] = None
     
+    # Graph API usage governor (percent of Meta's rate-limit budget)
+    GRAPH_USAGE_THRESHOLD: int = 80  # Hold back calls for a token above this usage
+    GRAPH_USAGE_MAX_WAIT_SECONDS: float = 5  # Longer waits fail fast instead of sleeping
+    
     # Twitter/X OAuth
     TWITTER_CLIENT_ID: Optional[str] = None
     TWITTER_CLIENT_SECRET: Optional[str] = None
@@ -64,6 +87,7 @@ class Settings(BaseSettings):
     # Twitter App-level credentials (OAuth 1.0a for media uploads)
     TWITTER_API_KEY: Optional[str] = None  # Consumer Key
     TWITTER_API_SECRET: Optional[str] = None  # Consumer Secret
+    TWITTER_APPEND_PARALLELISM: int = 6  # Concurrent APPEND requests for chunked media uploads
     
     # LinkedIn OAuth
     LINKEDIN_CLIENT_ID: Optional[str] = None
@@ -73,6 +97,19 @@ class Settings(BaseSettings):
     # Token refresh settings
     TOKEN_REFRESH_THRESHOLD_MINUTES: int = 30  # Refresh if expires in < 30 min
     TOKEN_REFRESH_RETRY_ATTEMPTS: int = 3
+    TOKEN_REFRESH_SWEEP_SECONDS: int = 300  # Refresh expiring connections in the background
+    
+    # OAuth state cleanup
+    OAUTH_STATE_GC_INTERVAL_SECONDS: int = 300
+    
+    # API key last_used_at is written in batches
+    API_KEY_USAGE_FLUSH_SECONDS: int = 30
+    
+    # Publish results are written to post_history in batches
+    POST_HISTORY_FLUSH_SECONDS: float = 0.1
+    
+    # Binary images larger than this are re-encoded as JPEG before upload
+    IMAGE_TRANSCODE_THRESHOLD_BYTES: int = 512 * 1024
     
     # Post scheduling
     SCHEDULER_CHECK_INTERVAL_SECONDS: int = 60  # Check for posts every 60 seconds
@@ -89,6 +126,11 @@ class Settings(BaseSettings):
     # Webhook configuration
     WEBHOOK_SECRET: Optional[str] = None
     
+    @property
+    def cors_origins(self) -> list:
+        """Get CORS origins as a list"""
+        return [origin.strip() for origin in self.CORS_ORIGINS.split(',') if origin.strip()]
+    
     @property
     def database_url(self) -> str:
         """Get PostgreSQL connection URL"""
@@ -2,15 +2,62 @@
 Database connection and session management
 """
 import psycopg2
-from psycopg2.extras import RealDictCursor
+import psycopg2.errors
+import psycopg2.extensions
+from psycopg2.pool import PoolError, ThreadedConnectionPool
+from psycopg2.extras import RealDictCursor, execute_values, register_default_jsonb
+from collections import OrderedDict
 from contextlib import contextmanager
 from typing import Generator
+import hashlib
+import itertools
 import logging
+import re
+import threading
+import time
 
 from app.config import settings
+from app.utils import json_fast
 
 logger = logging.getLogger(__name__)
 
+# Decode JSONB columns straight to Python objects with orjson
+register_default_jsonb(globally=True, loads=json_fast.loads)
+
+# String literals, quoted identifiers and comments (copied through), or a %s / %% escape
+_SQL_TOKEN = re.compile(
+    r"""'(?:[^']|'')*'|"(?:[^"]|"")*"|--[^\n]*|/\*.*?\*/|%[s%]""",
+    re.DOTALL
+)
+
+
+def _to_positional(query: str) -> str:
+    """
+    Rewrite psycopg2 %s placeholders as PREPARE-style $1, $2, ...
+    
+    Placeholders inside string literals, quoted identifiers and comments are
+    left alone; %% is unescaped everywhere, since PREPARE isn't run through
+    psycopg2's parameter substitution.
+    """
+    counter = itertools.count(1)
+    
+    def replace(match):
+        token = match.group(0)
+        if token == '%s':
+            return f"${next(counter)}"
+        return token.replace('%%', '%')
+    
+    return _SQL_TOKEN.sub(replace, query)
+
+
+class PreparingConnection(psycopg2.extensions.connection):
+    """Connection that remembers the statements it has prepared (SQL -> statement name)"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared = OrderedDict()
+        self.pool_slots = None  # Semaphore holding this connection's pool slot while checked out
+
 
 class Database:
     """Database connection manager"""
@@ -21,25 +68,84 @@ class Database:
             'port': settings.DB_PORT,
             'database': settings.DB_NAME,
             'user': settings.DB_USER,
-            'password': settings.DB_PASSWORD
+            'password': settings.DB_PASSWORD,
+            'connection_factory': PreparingConnection
         }
+        self._pool = None
+        self._slots = None
+        self._health_checked_at = 0.0
+        self._healthy = False
+    
+    def init_pool(self):
+        """Create the shared connection pool (called once on application startup)"""
+        if self._pool is None:
+            self._pool = ThreadedConnectionPool(
+                settings.DB_POOL_MIN_CONN,
+                settings.DB_POOL_MAX_CONN,
+                **self.connection_params
+            )
+            # getconn() fails at once when the pool is exhausted; this makes callers wait their turn
+            self._slots = threading.BoundedSemaphore(settings.DB_POOL_MAX_CONN)
+            logger.info(
+                f"Database pool created ({settings.DB_POOL_MIN_CONN}-{settings.DB_POOL_MAX_CONN} connections)"
+            )
+        return self._pool
+    
+    def close_pool(self):
+        """Close all pooled connections"""
+        if self._pool is not None:
+            self._pool.closeall()
+            self._pool = None
+            self._slots = None
+            logger.info("Database pool closed")
+    
+    def _acquire(self):
+        """Borrow a pooled connection, or open a standalone one if no pool exists (scripts)"""
+        if self._pool is not None:
+            slots = self._slots
+            if not slots.acquire(timeout=settings.DB_POOL_ACQUIRE_TIMEOUT_SECONDS):
+                raise PoolError(
+                    f"Timed out after {settings.DB_POOL_ACQUIRE_TIMEOUT_SECONDS}s waiting for a database connection"
+                )
+            try:
+                conn = self._pool.getconn()
+            except Exception:
+                slots.release()
+                raise
+            conn.pool_slots = slots
+            return conn
+        return psycopg2.connect(**self.connection_params)
+    
+    def _release(self, conn):
+        """Return a connection to the pool, discarding it if it was closed by an error"""
+        slots = getattr(conn, 'pool_slots', None)
+        try:
+            if self._pool is not None and slots is self._slots:
+                self._pool.putconn(conn, close=bool(conn.closed))
+            else:
+                conn.close()
+        finally:
+            if slots is not None:
+                conn.pool_slots = None
+                slots.release()
     
     @contextmanager
     def get_connection(self) -> Generator:
         """Get database connection with automatic cleanup"""
         conn = None
         try:
-            conn = psycopg2.connect(**self.connection_params)
+            conn = self._acquire()
             yield conn
             conn.commit()
         except Exception as e:
-            if conn:
+            if conn and not conn.closed:
                 conn.rollback()
+                self._reset_prepared(conn)
             logger.error(f"Database error: {e}")
             raise
         finally:
             if conn:
-                conn.close()
+                self._release(conn)
     
     @contextmanager
     def get_cursor(self, cursor_factory=RealDictCursor) -> Generator:
@@ -51,66 +157,201 @@ class Database:
             finally:
                 cursor.close()
     
-    def execute_query(self, query: str, params: tuple = None, fetch: bool = True):
-        """Execute a query and optionally fetch results"""
-        with self.get_cursor() as cursor:
+    def _execute(self, cursor, query: str, params: tuple = None, prepare: bool = False):
+        """
+        Execute a statement, optionally through the connection's prepared statement cache
+        
+        The first call for a given SQL string on a connection issues PREPARE;
+        later calls run EXECUTE, skipping server-side parse and plan.
+        
+        Args:
+            cursor: Open cursor
+            query: SQL with %s placeholders
+            params: Query parameters
+            prepare: Whether to use a prepared statement
+        """
+        cache_size = settings.DB_PREPARED_STATEMENT_CACHE_SIZE
+        prepared = getattr(cursor.connection, 'prepared', None)
+        if not prepare or not params or cache_size <= 0 or prepared is None:
             cursor.execute(query, params)
+            return
+        
+        name = prepared.get(query)
+        reused = name is not None
+        if name is None:
+            name = f"tm_{hashlib.sha1(query.encode()).hexdigest()[:16]}"
+            cursor.execute(f"PREPARE {name} AS {_to_positional(query)}")
+            prepared[query] = name
+            if len(prepared) > cache_size:
+                _, evicted = prepared.popitem(last=False)
+                cursor.execute(f"DEALLOCATE {evicted}")
+        else:
+            prepared.move_to_end(query)
+        
+        try:
+            cursor.execute(f"EXECUTE {name} ({', '.join(['%s'] * len(params))})", params)
+        except psycopg2.errors.FeatureNotSupported:
+            # "cached plan must not change result type": a migration altered a table the
+            # statement reads. Drop every prepared statement and run this one afresh, once.
+            if not reused:
+                raise
+            logger.info("Prepared statement %s is stale; re-preparing", name)
+            cursor.connection.rollback()
+            self._reset_prepared(cursor.connection)
+            self._execute(cursor, query, params, prepare)
+    
+    def _reset_prepared(self, conn):
+        """Drop all prepared statements after an error so the cache can't go stale"""
+        prepared = getattr(conn, 'prepared', None)
+        if not prepared:
+            return
+        prepared.clear()
+        try:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("DEALLOCATE ALL")
+            finally:
+                cursor.close()
+            conn.commit()
+        except psycopg2.Error as e:
+            logger.warning(f"Failed to deallocate prepared statements: {e}")
+    
+    def execute_query(self, query: str, params: tuple = None, fetch: bool = True,
+                      cursor_factory=RealDictCursor, prepare: bool = False):
+        """Execute a query and optionally fetch results (pass cursor_factory=None for plain tuples)"""
+        with self.get_cursor(cursor_factory) as cursor:
+            self._execute(cursor, query, params, prepare)
             if fetch:
                 return cursor.fetchall()
             return None
     
-    def execute_insert(self, query: str, params: tuple = None, returning: bool = True):
+    def execute_one(self, query: str, params: tuple = None, cursor_factory=RealDictCursor,
+                    prepare: bool = False):
+        """Execute a query and fetch only the first row (None if no rows)"""
+        with self.get_cursor(cursor_factory) as cursor:
+            self._execute(cursor, query, params, prepare)
+            return cursor.fetchone()
+    
+    def execute_insert(self, query: str, params: tuple = None, returning: bool = True,
+                       prepare: bool = False):
         """Execute an insert query and return the inserted row"""
         with self.get_cursor() as cursor:
-            cursor.execute(query, params)
+            self._execute(cursor, query, params, prepare)
             if returning:
                 return cursor.fetchone()
             return None
     
-    def execute_update(self, query: str, params: tuple = None, returning: bool = False):
+    def execute_update(self, query: str, params: tuple = None, returning: bool = False,
+                       prepare: bool = False):
         """Execute an update query"""
         with self.get_cursor() as cursor:
-            cursor.execute(query, params)
+            self._execute(cursor, query, params, prepare)
             if returning:
                 return cursor.fetchone()
             return cursor.rowcount
     
+    def execute_values(self, query: str, rows: list, template: str = None, page_size: int = 100):
+        """
+        Execute a query once for many rows using a single VALUES list
+        
+        Args:
+            query: SQL containing a single %s placeholder for the VALUES list
+            rows: Sequence of row tuples
+            template: Optional per-row template (e.g. "(%s, %s::timestamp)")
+            page_size: Maximum rows sent per statement
+        
+        Returns:
+            Number of rows affected by the last page
+        """
+        if not rows:
+            return 0
+        with self.get_cursor() as cursor:
+            execute_values(cursor, query, rows, template=template, page_size=page_size)
+            return cursor.rowcount
+    
     def execute_delete(self, query: str, params: tuple = None):
         """Execute a delete query"""
         with self.get_cursor() as cursor:
             cursor.execute(query, params)
             return cursor.rowcount
     
+    def _test_connection(self, conn) -> bool:
+        """Run the connectivity probe on an already open connection"""
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT 1")
+            return cursor.fetchone() is not None
+        finally:
+            cursor.close()
+    
     def test_connection(self) -> bool:
         """Test database connection"""
         try:
-            with self.get_cursor() as cursor:
-                cursor.execute("SELECT 1")
-                result = cursor.fetchone()
-                return result is not None
+            with self.get_connection() as conn:
+                return self._test_connection(conn)
         except Exception as e:
             logger.error(f"Database connection test failed: {e}")
             return False
     
-    def initialize_schema(self, schema_file: str = None):
-        """Initialize database schema from SQL file"""
+    def is_healthy(self) -> bool:
+        """
+        Cached database liveness check for health probes
+        
+        The probe runs on a pooled connection, so frequent liveness checks
+        don't open a new authenticated connection each time.
+        
+        Returns:
+            Result of the last probe, refreshed at most every DB_HEALTH_CACHE_SECONDS
+        """
+        now = time.monotonic()
+        if now - self._health_checked_at >= settings.DB_HEALTH_CACHE_SECONDS:
+            self._healthy = self.test_connection()
+            self._health_checked_at = now
+        return self._healthy
+    
+    def _initialize_schema(self, conn, schema_file: str = None):
+        """Run the schema SQL file on an already open connection"""
         if not schema_file:
             schema_file = "migrations/init_oauth_schema.sql"
         
+        with open(schema_file, 'r') as f:
+            schema_sql = f.read()
+        
+        cursor = conn.cursor()
+        try:
+            cursor.execute(schema_sql)
+        finally:
+            cursor.close()
+    
+    def initialize_schema(self, schema_file: str = None):
+        """Initialize database schema from SQL file"""
         try:
-            with open(schema_file, 'r') as f:
-                schema_sql = f.read()
-            
             with self.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(schema_sql)
-                cursor.close()
+                self._initialize_schema(conn, schema_file)
             
             logger.info("Database schema initialized successfully")
             return True
         except Exception as e:
             logger.error(f"Failed to initialize database schema: {e}")
             raise
+    
+    def bootstrap(self) -> bool:
+        """
+        Create the connection pool and verify connectivity
+        
+        The probe runs on the pool's first connection, which then stays open
+        for regular requests instead of being torn down after startup.
+        
+        Returns:
+            True if the database is reachable
+        """
+        try:
+            self.init_pool()
+            with self.get_connection() as conn:
+                return self._test_connection(conn)
+        except Exception as e:
+            logger.error(f"Database bootstrap failed: {e}")
+            return False
 
 
 # Global database instance
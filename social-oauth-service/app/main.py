@@ -1,16 +1,28 @@
 """
 Main FastAPI Application for OAuth Service
 """
-from fastapi import FastAPI, HTTPException, Header, Depends
+from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import RedirectResponse
+from fastapi.responses import RedirectResponse, ORJSONResponse, Response
+from contextlib import asynccontextmanager
+import asyncio
 import logging
-from typing import Optional
 
 from app.config import settings
 from app.database import db
 from app.api import oauth_routes, publish_routes, health_routes
+from app.api.dependencies import verify_api_key
+from app.oauth.token_manager import token_manager
 from app.utils.temp_image_storage import temp_image_storage
+from app.publishers.twitter_publisher import shutdown_processing_pool
+from app.scheduler.maintenance import (
+    oauth_state_gc_loop,
+    api_key_usage_flush_loop,
+    flush_api_key_usage,
+    post_history_flush_loop,
+    flush_post_history,
+    token_refresh_loop
+)
 
 # Configure logging
 logging.basicConfig(
@@ -19,76 +31,84 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Initialize FastAPI app
-app = FastAPI(
-    title=settings.APP_NAME,
-    version=settings.APP_VERSION,
-    description="OAuth 2.0 Service for Social Media Platforms (Instagram & Facebook)",
-    debug=settings.DEBUG
-)
-
-# Configure CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # Configure appropriately for production
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
 
-# API Key Authentication Dependency
-async def verify_api_key(x_api_key: Optional[str] = Header(None)):
-    """Verify service-to-service API key"""
-    if not x_api_key:
-        raise HTTPException(status_code=401, detail="API key required")
-    
-    # Check if API key is valid
-    result = db.execute_query(
-        "SELECT is_active FROM service_api_keys WHERE api_key = %s",
-        (x_api_key,)
-    )
-    
-    if not result or len(result) == 0 or not result[0]['is_active']:
-        raise HTTPException(status_code=401, detail="Invalid API key")
-    
-    # Update last used timestamp
-    db.execute_update(
-        "UPDATE service_api_keys SET last_used_at = CURRENT_TIMESTAMP WHERE api_key = %s",
-        (x_api_key,)
-    )
-    
-    return x_api_key
+def _cleanup_temp_images():
+    """Remove temporary images left over from a previous run"""
+    try:
+        temp_image_storage.cleanup_old_images(max_age_hours=1)
+        logger.info("✓ Cleaned up old temporary images")
+    except Exception as e:
+        logger.warning(f"Failed to cleanup old temp images: {e}")
 
 
-# Startup event
-@app.on_event("startup")
-async def startup_event():
-    """Initialize application on startup"""
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize the application on startup and clean up on shutdown"""
     logger.info(f"Starting {settings.APP_NAME} v{settings.APP_VERSION}")
     
-    # Test database connection
-    if db.test_connection():
+    # Pool bootstrap and temp image cleanup are independent, run them together
+    db_ok, _ = await asyncio.gather(
+        asyncio.to_thread(db.bootstrap),
+        asyncio.to_thread(_cleanup_temp_images)
+    )
+    if db_ok:
         logger.info("✓ Database connection successful")
     else:
         logger.error("✗ Database connection failed")
         raise RuntimeError("Cannot connect to database")
     
-    # Clean up old temporary images
-    try:
-        temp_image_storage.cleanup_old_images(max_age_hours=1)
-        logger.info("✓ Cleaned up old temporary images")
-    except Exception as e:
-        logger.warning(f"Failed to cleanup old temp images: {e}")
+    await asyncio.to_thread(token_manager.start_invalidation_listener)
+    
+    # Background maintenance (stale OAuth states, API key usage, publish history, expiring tokens)
+    background_tasks = [
+        asyncio.create_task(oauth_state_gc_loop()),
+        asyncio.create_task(api_key_usage_flush_loop()),
+        asyncio.create_task(post_history_flush_loop()),
+        asyncio.create_task(token_refresh_loop(oauth_routes.PROVIDERS))
+    ]
     
     logger.info(f"✓ OAuth Service ready on {settings.HOST}:{settings.PORT}")
+    
+    yield
+    
+    logger.info("Shutting down OAuth Service")
+    for task in background_tasks:
+        task.cancel()
+    # Deferred tweets record their results (or are recorded as failed) before the final drain
+    await asyncio.to_thread(shutdown_processing_pool)
+    try:
+        flush_api_key_usage()
+    except Exception as e:
+        logger.warning(f"Failed to flush API key usage: {e}")
+    try:
+        flush_post_history()
+    except Exception as e:
+        logger.warning(f"Failed to flush post history: {e}")
+    for provider in oauth_routes.PROVIDERS.values():
+        await provider.aclose()
+    token_manager.stop_invalidation_listener()
+    db.close_pool()
 
 
-# Shutdown event
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Cleanup on shutdown"""
-    logger.info("Shutting down OAuth Service")
+# Initialize FastAPI app
+app = FastAPI(
+    title=settings.APP_NAME,
+    version=settings.APP_VERSION,
+    description="OAuth 2.0 Service for Social Media Platforms (Instagram & Facebook)",
+    debug=settings.DEBUG,
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
+)
+
+# Configure CORS
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=settings.cors_origins,
+    allow_origin_regex=settings.CORS_ORIGIN_REGEX or None,
+    allow_credentials=False,  # Callers authenticate with X-API-Key, not cookies
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
 
 
 # Root endpoint
@@ -120,23 +140,39 @@ app.include_router(
 
 
 # Error handlers
+# Body of the generic 500 response, serialized once at import time
+_INTERNAL_ERROR_BODY = ORJSONResponse(content={
+    "success": False,
+    "error": "Internal server error",
+    "detail": "An error occurred"
+}).body
+
+
 @app.exception_handler(404)
 async def not_found_handler(request, exc):
-    return {
-        "success": False,
-        "error": "Endpoint not found",
-        "detail": str(exc)
-    }
+    return ORJSONResponse(
+        status_code=404,
+        content={
+            "success": False,
+            "error": "Endpoint not found",
+            "detail": str(exc)
+        }
+    )
 
 
 @app.exception_handler(500)
 async def internal_error_handler(request, exc):
     logger.error(f"Internal server error: {exc}")
-    return {
-        "success": False,
-        "error": "Internal server error",
-        "detail": str(exc) if settings.DEBUG else "An error occurred"
-    }
+    if not settings.DEBUG:
+        return Response(content=_INTERNAL_ERROR_BODY, media_type="application/json", status_code=500)
+    return ORJSONResponse(
+        status_code=500,
+        content={
+            "success": False,
+            "error": "Internal server error",
+            "detail": str(exc)
+        }
+    )
 
 
 if __name__ == "__main__":
@@ -2,28 +2,137 @@
 Base OAuth Provider - abstract class for platform-specific OAuth implementations
 """
 from abc import ABC, abstractmethod
+from functools import wraps
 from typing import Dict, Any, Optional, Tuple
-from datetime import datetime, timedelta
-import secrets
+from datetime import datetime, timedelta, timezone
+import asyncio
+import inspect
 import hashlib
 import base64
 import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from cachetools import TTLCache
 
 from app.oauth.token_manager import token_manager
 from app.database import db
 from app.config import settings
+from app.utils.http import create_client
 
 logger = logging.getLogger(__name__)
 
+_sha = hashlib.sha256
+_TEN_MINUTES = timedelta(minutes=10)  # OAuth state lifetime
+
+
+class _TokenFactory:
+    """Hands out URL-safe random tokens sliced from a shared os.urandom buffer"""
+    
+    BUFFER_SIZE = 4096
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = None
+        self._buf = b''
+        self._pos = 0
+    
+    def next_urlsafe(self, n: int = 32) -> str:
+        """Return n random bytes encoded like secrets.token_urlsafe(n)"""
+        with self._lock:
+            # Refill when exhausted, and never share random bytes with a forked parent
+            if self._pos + n > len(self._buf) or self._pid != os.getpid():
+                self._buf = os.urandom(max(self.BUFFER_SIZE, n))
+                self._pos = 0
+                self._pid = os.getpid()
+            chunk = self._buf[self._pos:self._pos + n]
+            self._pos += n
+        return base64.urlsafe_b64encode(chunk).rstrip(b'=').decode('ascii')
+
+
+_tokens = _TokenFactory()
+
+# Background workers for token revocation calls nobody waits on
+REVOKE_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="oauth-revoke")
+
+# Guards the per-token refresh lock maps and refreshed-token caches
+_refresh_guard = threading.Lock()
+
+
+def _token_hash(token: str) -> str:
+    """Short, non-reversible cache key prefix for an access token"""
+    return _sha(token.encode()).hexdigest()[:16]
+
+
+def pkce_challenge(verifier: str) -> str:
+    """S256 PKCE code_challenge for a code_verifier"""
+    return base64.urlsafe_b64encode(_sha(verifier.encode('ascii')).digest()).rstrip(b'=').decode('ascii')
+
+
+def cached_by_token(method):
+    """
+    Cache a provider lookup per access token in the provider's _token_cache
+    
+    The key is the token hash plus the first extra argument (e.g. page_id),
+    or 'me' for user-scoped lookups. Sync and async lookups share entries.
+    Providers without a cache are unaffected.
+    """
+    def _key(access_token: str, args: tuple) -> str:
+        return f"{_token_hash(access_token)}:{args[0] if args else 'me'}"
+    
+    if inspect.iscoroutinefunction(method):
+        @wraps(method)
+        async def async_wrapper(self, access_token: str, *args, **kwargs):
+            cache = self._token_cache
+            if cache is None:
+                return await method(self, access_token, *args, **kwargs)
+            
+            key = _key(access_token, args)
+            with self._token_cache_lock:
+                if key in cache:
+                    return cache[key]
+            
+            result = await method(self, access_token, *args, **kwargs)
+            with self._token_cache_lock:
+                cache[key] = result
+            return result
+        return async_wrapper
+    
+    @wraps(method)
+    def wrapper(self, access_token: str, *args, **kwargs):
+        cache = self._token_cache
+        if cache is None:
+            return method(self, access_token, *args, **kwargs)
+        
+        key = _key(access_token, args)
+        with self._token_cache_lock:
+            if key in cache:
+                return cache[key]
+        
+        result = method(self, access_token, *args, **kwargs)
+        with self._token_cache_lock:
+            cache[key] = result
+        return result
+    return wrapper
+
 
 class BaseOAuthProvider(ABC):
     """Base class for OAuth 2.0 providers"""
     
+    # Per-token lookup cache used by @cached_by_token (None disables caching)
+    _token_cache = None
+    _token_cache_lock = threading.Lock()
+    
     def __init__(self, platform: str):
         self.platform = platform
         self.client_id = None
         self.client_secret = None
         self.redirect_uri = None
+        self.http = create_client()  # Keep-alive HTTP/2 connection to the platform API
+        self.aclient = None  # Async client, created by providers with native async calls
+        self._refresh_locks = {}  # token hash -> lock held while that token is refreshed
+        self._refreshed = TTLCache(maxsize=256, ttl=60)  # token hash -> fresh token data
         self._load_credentials()
     
     @abstractmethod
@@ -46,6 +155,10 @@ class BaseOAuthProvider(ABC):
         """
         pass
     
+    async def aexchange_code_for_token(self, code: str, **kwargs) -> Dict[str, Any]:
+        """Async variant of exchange_code_for_token (runs the sync call in a worker thread)"""
+        return await asyncio.to_thread(self.exchange_code_for_token, code, **kwargs)
+    
     @abstractmethod
     def refresh_access_token(self, refresh_token: str) -> Dict[str, Any]:
         """
@@ -66,6 +179,15 @@ class BaseOAuthProvider(ABC):
         """
         pass
     
+    async def aget_user_info(self, access_token: str) -> Dict[str, Any]:
+        """Async variant of get_user_info (runs the sync call in a worker thread)"""
+        return await asyncio.to_thread(self.get_user_info, access_token)
+    
+    async def aclose(self):
+        """Close the async HTTP client, if any"""
+        if self.aclient is not None:
+            await self.aclient.aclose()
+    
     @abstractmethod
     def revoke_token(self, token: str) -> bool:
         """Revoke an access token"""
@@ -82,20 +204,18 @@ class BaseOAuthProvider(ABC):
             Tuple of (state_token, code_verifier) - code_verifier may be None
         """
         # Generate state token
-        state_token = secrets.token_urlsafe(32)
+        state_token = _tokens.next_urlsafe(32)
         
         # Generate PKCE code verifier and challenge (if platform requires it)
         code_verifier = None
         code_challenge = None
         
         if self.requires_pkce():
-            code_verifier = secrets.token_urlsafe(32)
-            code_challenge = base64.urlsafe_b64encode(
-                hashlib.sha256(code_verifier.encode()).digest()
-            ).decode().rstrip('=')
+            code_verifier = _tokens.next_urlsafe(32)
+            code_challenge = pkce_challenge(code_verifier)
         
         # Store state in database with expiration
-        expires_at = datetime.now() + timedelta(minutes=10)  # 10 minute expiration
+        expires_at = datetime.now(tz=timezone.utc) + _TEN_MINUTES
         
         try:
             db.execute_insert(
@@ -125,36 +245,23 @@ class BaseOAuthProvider(ABC):
             brand_id if found, None otherwise
         """
         try:
-            result = db.execute_query(
+            # Expiration and reuse are enforced by the WHERE clause
+            state = db.execute_one(
                 """
-                SELECT brand_id, expires_at, used 
-                FROM oauth_states 
+                SELECT brand_id
+                FROM oauth_states
                 WHERE state_token = %s AND platform = %s
+                  AND used = false AND expires_at > CURRENT_TIMESTAMP
                 """,
-                (state_token, self.platform)
+                (state_token, self.platform),
+                cursor_factory=None
             )
             
-            if not result or len(result) == 0:
-                logger.warning(f"No brand_id found for state token: {state_token}")
+            if not state:
+                logger.warning(f"No valid state found for state token: {state_token}")
                 return None
             
-            state = dict(result[0])
-            
-            # Check if already used
-            if state['used']:
-                logger.warning(f"State token already used: {state_token}")
-                return None
-            
-            # Check expiration
-            expires_at = state['expires_at']
-            if isinstance(expires_at, str):
-                expires_at = datetime.fromisoformat(expires_at)
-            
-            if datetime.now() > expires_at:
-                logger.warning(f"State token expired: {state_token}")
-                return None
-            
-            return state.get('brand_id')
+            return state[0]
             
         except Exception as e:
             logger.error(f"Failed to retrieve brand_id from state token: {e}")
@@ -164,6 +271,9 @@ class BaseOAuthProvider(ABC):
         """
         Verify state token and get code_verifier if available
         
+        The lookup and the "mark as used" update run as a single statement so
+        two concurrent callbacks can never both consume the same state token.
+        
         Args:
             state_token: State token from OAuth callback
             brand_id: Brand ID to verify
@@ -172,47 +282,55 @@ class BaseOAuthProvider(ABC):
             code_verifier if PKCE is used, None otherwise
         """
         try:
-            result = db.execute_query(
+            state = db.execute_one(
                 """
-                SELECT code_verifier, expires_at, used 
-                FROM oauth_states 
-                WHERE state_token = %s AND platform = %s AND brand_id = %s
+                WITH s AS (
+                    SELECT id, code_verifier
+                    FROM oauth_states
+                    WHERE state_token = %s AND platform = %s AND brand_id = %s
+                      AND used = false AND expires_at > CURRENT_TIMESTAMP
+                    FOR UPDATE SKIP LOCKED
+                )
+                UPDATE oauth_states SET used = true
+                FROM s
+                WHERE oauth_states.id = s.id
+                RETURNING s.code_verifier
                 """,
-                (state_token, self.platform, brand_id)
+                (state_token, self.platform, brand_id),
+                cursor_factory=None
             )
             
-            if not result or len(result) == 0:
-                logger.warning(f"Invalid state token: {state_token}")
-                return None
-            
-            state = dict(result[0])
-            
-            # Check if already used
-            if state['used']:
-                logger.warning(f"State token already used: {state_token}")
+            if not state:
+                logger.warning(f"Invalid, expired or already used state token: {state_token}")
                 return None
             
-            # Check expiration
-            expires_at = state['expires_at']
-            if isinstance(expires_at, str):
-                expires_at = datetime.fromisoformat(expires_at)
-            
-            if datetime.now() > expires_at:
-                logger.warning(f"State token expired: {state_token}")
-                return None
-            
-            # Mark as used
-            db.execute_update(
-                "UPDATE oauth_states SET used = true WHERE state_token = %s",
-                (state_token,)
-            )
-            
-            return state.get('code_verifier')
+            return state[0]
             
         except Exception as e:
             logger.error(f"Failed to verify state token: {e}")
             return None
     
+    def invalidate(self, access_token: str):
+        """Drop every cached lookup made with an access token"""
+        if self._token_cache is None:
+            return
+        prefix = f"{_token_hash(access_token)}:"
+        with self._token_cache_lock:
+            for key in [k for k in self._token_cache if k.startswith(prefix)]:
+                self._token_cache.pop(key, None)
+    
+    def _revoke_in_background(self, url: str, params: Dict[str, Any], method: str = "DELETE"):
+        """Send a revocation request from REVOKE_POOL and log its outcome"""
+        def _log_result(future):
+            try:
+                future.result().raise_for_status()
+                logger.info(f"{self.platform} token revoked successfully")
+            except Exception as e:
+                logger.error(f"Failed to revoke {self.platform} token: {e}")
+        
+        future = REVOKE_POOL.submit(self.http.request, method, url, params=params, timeout=5)
+        future.add_done_callback(_log_result)
+    
     def requires_pkce(self) -> bool:
         """Override this if platform requires PKCE (Proof Key for Code Exchange)"""
         return False
@@ -288,7 +406,7 @@ class BaseOAuthProvider(ABC):
         
         try:
             logger.info(f"Refreshing token for brand {brand_id} on {self.platform}")
-            new_token_data = self.refresh_access_token(refresh_token)
+            new_token_data = self._refresh_once(refresh_token)
             
             token_manager.update_tokens(
                 brand_id=brand_id,
@@ -306,6 +424,35 @@ class BaseOAuthProvider(ABC):
             token_manager.mark_error(brand_id, self.platform, str(e))
             raise  # Re-raise so caller knows it failed
     
+    def _refresh_once(self, refresh_token: str) -> Dict[str, Any]:
+        """
+        Refresh a token, letting concurrent callers with the same token share one exchange
+        
+        Args:
+            refresh_token: Refresh token (or current access token for token-exchange platforms)
+        
+        Returns:
+            New token data
+        """
+        key = _token_hash(refresh_token)
+        with _refresh_guard:
+            lock = self._refresh_locks.setdefault(key, threading.Lock())
+        
+        try:
+            with lock:
+                with _refresh_guard:
+                    token_data = self._refreshed.get(key)
+                if token_data is not None:
+                    return token_data
+                
+                token_data = self.refresh_access_token(refresh_token)
+                with _refresh_guard:
+                    self._refreshed[key] = token_data
+                return token_data
+        finally:
+            with _refresh_guard:
+                self._refresh_locks.pop(key, None)
+    
     def disconnect(self, brand_id: int) -> bool:
         """Disconnect OAuth connection"""
         connection = self.get_connection(brand_id)
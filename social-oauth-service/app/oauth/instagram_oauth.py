@@ -2,26 +2,43 @@
 Instagram OAuth Provider (via Facebook Graph API)
 Instagram Graph API is accessed through Facebook OAuth
 """
-import requests
+import httpx
 from typing import Dict, Any
+import orjson
+import ijson
 import logging
 from urllib.parse import urlencode
 
-from app.oauth.base_provider import BaseOAuthProvider
+from app.oauth.base_provider import cached_by_token
+from app.oauth.meta_provider import MetaGraphOAuthProvider
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+_loads = orjson.loads
 
-class InstagramOAuthProvider(BaseOAuthProvider):
+IG_ACCOUNT_FIELDS = 'id,username,name,profile_picture_url'
+STREAM_PARSE_THRESHOLD = 256 * 1024  # Stream-parse /me/accounts responses above this size
+
+
+class InstagramOAuthProvider(MetaGraphOAuthProvider):
     """Instagram OAuth provider using Facebook Graph API"""
     
+    _SCOPES = (
+        'instagram_basic',
+        'instagram_content_publish',
+        'instagram_manage_comments',
+        'instagram_manage_insights',
+        'pages_show_list',
+        'pages_read_engagement',
+        'business_management',
+        'public_profile',
+    )
+    _SCOPE_CSV = ','.join(_SCOPES)
+    
     def __init__(self):
-        super().__init__('instagram')
         # Instagram uses Facebook OAuth system
-        self.auth_url = "https://www.facebook.com/v18.0/dialog/oauth"
-        self.token_url = "https://graph.facebook.com/v18.0/oauth/access_token"
-        self.graph_api_url = "https://graph.facebook.com/v18.0"
+        super().__init__('instagram', 'Instagram')
     
     def _load_credentials(self):
         """Load Instagram OAuth credentials from settings"""
@@ -30,141 +47,57 @@ class InstagramOAuthProvider(BaseOAuthProvider):
         self.client_secret = settings.FACEBOOK_CLIENT_SECRET
         self.redirect_uri = settings.INSTAGRAM_REDIRECT_URI or f"{settings.BASE_CALLBACK_URL}/api/v1/oauth/instagram/callback"
     
-    def get_scopes(self) -> list:
-        """Get required Instagram scopes via Facebook Login"""
-        return [
-            'instagram_basic',
-            'instagram_content_publish',
-            'instagram_manage_comments',
-            'instagram_manage_insights',
-            'pages_show_list',
-            'pages_read_engagement',
-            'business_management',
-            'public_profile'
-        ]
-    
-    def get_authorization_url(self, state: str, **kwargs) -> str:
-        """
-        Get Instagram authorization URL (via Facebook OAuth)
-        
-        Args:
-            state: State token for CSRF protection
-            **kwargs: Additional parameters
-        
-        Returns:
-            Authorization URL
-        """
-        params = {
-            'client_id': self.client_id,
-            'redirect_uri': self.redirect_uri,
-            'scope': ','.join(self.get_scopes()),
-            'response_type': 'code',
-            'state': state
-        }
-        
-        url = f"{self.auth_url}?{urlencode(params)}"
-        logger.info(f"Generated Instagram auth URL (via Facebook) for state: {state}")
-        return url
-    
-    def exchange_code_for_token(self, code: str, **kwargs) -> Dict[str, Any]:
+    @cached_by_token
+    def get_user_info(self, access_token: str) -> Dict[str, Any]:
         """
-        Exchange authorization code for access token
+        Get Instagram user information via Facebook Pages
         
         Args:
-            code: Authorization code from callback
+            access_token: Facebook/Instagram access token
         
         Returns:
-            Token data with access_token, etc.
+            User information with Instagram Business Account details
         """
         try:
-            # Step 1: Exchange code for short-lived Facebook token
-            response = requests.get(
-                self.token_url,
-                params={
-                    'client_id': self.client_id,
-                    'client_secret': self.client_secret,
-                    'redirect_uri': self.redirect_uri,
-                    'code': code
-                },
-                timeout=30
-            )
-            response.raise_for_status()
-            short_token_data = response.json()
-            
-            logger.info("Received short-lived token for Instagram (via Facebook)")
-            
-            # Step 2: Exchange for long-lived user access token (60 days)
-            long_token_response = requests.get(
-                f"{self.graph_api_url}/oauth/access_token",
+            # Get user's Facebook Pages and keep those with an Instagram Business Account
+            with self.http.stream(
+                "GET",
+                f"{self.graph_api_url}/me/accounts",
                 params={
-                    'grant_type': 'fb_exchange_token',
-                    'client_id': self.client_id,
-                    'client_secret': self.client_secret,
-                    'fb_exchange_token': short_token_data['access_token']
+                    'fields': 'id,name,access_token,instagram_business_account',
+                    'access_token': access_token
                 },
                 timeout=30
-            )
-            long_token_response.raise_for_status()
-            long_token_data = long_token_response.json()
+            ) as pages_response:
+                if pages_response.is_error:
+                    # Error bodies are small; read them so the handler below can log the text
+                    pages_response.read()
+                pages_response.raise_for_status()
+                
+                # Large page lists (agencies) are stream-parsed to keep memory flat
+                content_length = int(pages_response.headers.get('content-length') or 0)
+                if content_length > STREAM_PARSE_THRESHOLD:
+                    pages_with_ig = self._stream_pages_with_instagram(pages_response)
+                else:
+                    pages_with_ig = self._pages_with_instagram(_loads(pages_response.read()))
             
-            logger.info("Exchanged for long-lived token for Instagram access")
+            # Look up all Instagram accounts in a single batch request
+            ig_results = []
+            if pages_with_ig:
+                ig_results = self._graph_batch(access_token, self._ig_lookup_urls(pages_with_ig, access_token))
             
-            return {
-                'access_token': long_token_data['access_token'],
-                'token_type': long_token_data.get('token_type', 'bearer'),
-                'expires_in': long_token_data.get('expires_in', 5184000),  # 60 days
-                'refresh_token': None  # Facebook uses token exchange, not refresh tokens
-            }
+            return self._build_user_info(pages_with_ig, ig_results, access_token)
             
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to exchange code for Instagram token: {e}")
-            if hasattr(e, 'response') and e.response:
+        except httpx.HTTPError as e:
+            logger.error(f"Failed to get Instagram user info: {e}")
+            if isinstance(e, httpx.HTTPStatusError):
                 logger.error(f"Response: {e.response.text}")
-            raise ValueError(f"Failed to obtain Instagram access token: {str(e)}")
-    
-    def refresh_access_token(self, refresh_token: str) -> Dict[str, Any]:
-        """
-        Refresh Instagram access token
-        
-        Note: Uses Facebook token exchange system
-        The 'refresh_token' parameter is actually the current access token
-        
-        Args:
-            refresh_token: Current access token to refresh
-        
-        Returns:
-            New token data
-        """
-        try:
-            response = requests.get(
-                f"{self.graph_api_url}/oauth/access_token",
-                params={
-                    'grant_type': 'fb_exchange_token',
-                    'client_id': self.client_id,
-                    'client_secret': self.client_secret,
-                    'fb_exchange_token': refresh_token
-                },
-                timeout=30
-            )
-            response.raise_for_status()
-            token_data = response.json()
-            
-            logger.info("Instagram access token refreshed successfully")
-            
-            return {
-                'access_token': token_data['access_token'],
-                'token_type': token_data.get('token_type', 'bearer'),
-                'expires_in': token_data.get('expires_in', 5184000),
-                'refresh_token': None
-            }
-            
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to refresh Instagram token: {e}")
-            raise ValueError(f"Failed to refresh Instagram access token: {str(e)}")
+            raise ValueError(f"Failed to get Instagram user information: {str(e)}")
     
-    def get_user_info(self, access_token: str) -> Dict[str, Any]:
+    @cached_by_token
+    async def aget_user_info(self, access_token: str) -> Dict[str, Any]:
         """
-        Get Instagram user information via Facebook Pages
+        Async variant of get_user_info
         
         Args:
             access_token: Facebook/Instagram access token
@@ -173,123 +106,148 @@ class InstagramOAuthProvider(BaseOAuthProvider):
             User information with Instagram Business Account details
         """
         try:
-            # Get user's Facebook Pages
-            pages_response = requests.get(
+            pages_response = await self.aclient.get(
                 f"{self.graph_api_url}/me/accounts",
                 params={
                     'fields': 'id,name,access_token,instagram_business_account',
                     'access_token': access_token
-                },
-                timeout=30
+                }
             )
             pages_response.raise_for_status()
-            pages_data = pages_response.json()
-            
-            # Find pages with Instagram Business Account connected
-            instagram_accounts = []
-            for page in pages_data.get('data', []):
-                if 'instagram_business_account' in page:
-                    ig_account_id = page['instagram_business_account']['id']
-                    page_token = page.get('access_token', access_token)
-                    
-                    # Get Instagram account details
-                    ig_response = requests.get(
-                        f"{self.graph_api_url}/{ig_account_id}",
-                        params={
-                            'fields': 'id,username,name,profile_picture_url,followers_count,media_count',
-                            'access_token': page_token
-                        },
-                        timeout=30
-                    )
-                    
-                    if ig_response.status_code == 200:
-                        ig_data = ig_response.json()
-                        instagram_accounts.append({
-                            'ig_account_id': ig_account_id,
-                            'username': ig_data.get('username'),
-                            'name': ig_data.get('name'),
-                            'profile_picture_url': ig_data.get('profile_picture_url'),
-                            'followers_count': ig_data.get('followers_count'),
-                            'media_count': ig_data.get('media_count'),
-                            'page_id': page['id'],
-                            'page_name': page['name'],
-                            'page_token': page_token
-                        })
-            
-            if not instagram_accounts:
-                raise ValueError("No Instagram Business Account found connected to your Facebook Pages. Please connect an Instagram Business Account to your Facebook Page.")
+            pages_with_ig = self._pages_with_instagram(_loads(pages_response.content))
             
-            # Use the first Instagram account found
-            primary_account = instagram_accounts[0]
+            ig_results = []
+            if pages_with_ig:
+                ig_results = await self._agraph_batch(access_token, self._ig_lookup_urls(pages_with_ig, access_token))
             
-            logger.info(f"Retrieved Instagram account info for: {primary_account['username']}")
-            logger.info(f"  - Instagram Account ID: {primary_account['ig_account_id']}")
-            logger.info(f"  - Page ID: {primary_account['page_id']}")
-            logger.info(f"  - Has page_token: {bool(primary_account.get('page_token'))}")
-            logger.info(f"  - Total accounts found: {len(instagram_accounts)}")
+            return self._build_user_info(pages_with_ig, ig_results, access_token)
             
-            return {
-                'user_id': primary_account['ig_account_id'],
-                'username': primary_account['username'],
-                'account_name': primary_account.get('name'),
-                'profile_picture': primary_account.get('profile_picture_url'),
-                'followers_count': primary_account.get('followers_count'),
-                'media_count': primary_account.get('media_count'),
-                'page_id': primary_account['page_id'],
-                'page_name': primary_account['page_name'],
-                'page_token': primary_account['page_token'],
-                'all_accounts': instagram_accounts,
-                'platform': 'instagram'
-            }
-            
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"Failed to get Instagram user info: {e}")
-            if hasattr(e, 'response') and e.response:
+            if isinstance(e, httpx.HTTPStatusError):
                 logger.error(f"Response: {e.response.text}")
             raise ValueError(f"Failed to get Instagram user information: {str(e)}")
     
-    def revoke_token(self, token: str) -> bool:
+    def _pages_with_instagram(self, pages_data: Dict[str, Any]) -> list:
+        """Pages from a /me/accounts response that have an Instagram Business Account"""
+        return [
+            page for page in pages_data.get('data', [])
+            if 'instagram_business_account' in page
+        ]
+    
+    def _stream_pages_with_instagram(self, response: httpx.Response) -> list:
+        """Stream-parse a /me/accounts response, keeping only pages with Instagram"""
+        pages = []
+        found = ijson.sendable_list()
+        parser = ijson.items_coro(found, 'data.item')
+        for chunk in response.iter_bytes():
+            parser.send(chunk)
+            for page in found:
+                if 'instagram_business_account' in page:
+                    pages.append({
+                        key: page[key]
+                        for key in ('id', 'name', 'access_token', 'instagram_business_account')
+                        if key in page
+                    })
+            del found[:]
+        parser.close()
+        return pages
+    
+    @staticmethod
+    def _ig_lookup_urls(pages_with_ig: list, access_token: str) -> list:
+        """Batch relative URLs looking up each page's Instagram account with the page's own token"""
+        return [
+            f"{page['instagram_business_account']['id']}?" + urlencode({
+                'fields': IG_ACCOUNT_FIELDS,
+                'access_token': page.get('access_token', access_token)
+            })
+            for page in pages_with_ig
+        ]
+    
+    @staticmethod
+    def _account_entry(page: Dict[str, Any], ig_data: Dict[str, Any], access_token: str) -> Dict[str, Any]:
+        """One all_accounts entry: an Instagram account and the page it's connected to"""
+        return {
+            'ig_account_id': page['instagram_business_account']['id'],
+            'username': ig_data.get('username'),
+            'name': ig_data.get('name'),
+            'profile_picture_url': ig_data.get('profile_picture_url'),
+            'page_id': page['id'],
+            'page_name': page['name'],
+            'page_token': page.get('access_token', access_token)
+        }
+    
+    def _build_user_info(self, pages_with_ig: list, ig_results: list, access_token: str) -> Dict[str, Any]:
         """
-        Revoke Instagram access token (via Facebook)
+        Build the connection's user info from per-page Instagram lookups
         
         Args:
-            token: Access token to revoke
+            pages_with_ig: Pages with a connected Instagram Business Account
+            ig_results: (status_code, account data) per page, in the same order
+            access_token: User token, used when a page has no token of its own
         
         Returns:
-            True if successful
+            User information for the first connected Instagram account
         """
-        try:
-            response = requests.delete(
-                f"{self.graph_api_url}/me/permissions",
-                params={'access_token': token},
-                timeout=10
-            )
-            response.raise_for_status()
-            logger.info("Instagram token revoked successfully")
-            return True
-        except Exception as e:
-            logger.error(f"Failed to revoke Instagram token: {e}")
-            return False
+        instagram_accounts = [
+            self._account_entry(page, ig_data, access_token)
+            for page, (status_code, ig_data) in zip(pages_with_ig, ig_results)
+            if status_code == 200 and ig_data
+        ]
+        
+        if not instagram_accounts:
+            raise ValueError("No Instagram Business Account found connected to your Facebook Pages. Please connect an Instagram Business Account to your Facebook Page.")
+        
+        # Use the first Instagram account found
+        primary_account = instagram_accounts[0]
+        
+        logger.info("Retrieved Instagram account info for: %s", primary_account['username'])
+        logger.info("  - Instagram Account ID: %s", primary_account['ig_account_id'])
+        logger.info("  - Page ID: %s", primary_account['page_id'])
+        logger.info("  - Has page_token: %s", bool(primary_account.get('page_token')))
+        logger.info("  - Total accounts found: %d", len(instagram_accounts))
+        
+        return {
+            'user_id': primary_account['ig_account_id'],
+            'username': primary_account['username'],
+            'account_name': primary_account.get('name'),
+            'profile_picture': primary_account.get('profile_picture_url'),
+            'page_id': primary_account['page_id'],
+            'page_name': primary_account['page_name'],
+            'page_token': primary_account['page_token'],
+            'all_accounts': instagram_accounts,
+            'platform': 'instagram'
+        }
     
-    def validate_token(self, access_token: str) -> bool:
+    def get_account_counts(self, ig_account_id: str, access_token: str) -> Dict[str, Any]:
         """
-        Validate if an Instagram access token is still valid
+        Get follower and media counts for an Instagram account
+        
+        Counts aren't needed to complete the OAuth flow, so they're only
+        fetched when a caller asks for them.
         
         Args:
-            access_token: Token to validate
+            ig_account_id: Instagram Business Account ID
+            access_token: Page or user access token
         
         Returns:
-            True if valid, False otherwise
+            dict with followers_count and media_count
         """
         try:
-            response = requests.get(
-                f"{self.graph_api_url}/me",
-                params={'access_token': access_token},
-                timeout=10
+            data = self._graph_get(
+                ig_account_id,
+                params={
+                    'fields': 'followers_count,media_count',
+                    'access_token': access_token
+                }
             )
-            return response.status_code == 200
-        except:
-            return False
+            return {
+                'followers_count': data.get('followers_count'),
+                'media_count': data.get('media_count')
+            }
+        except httpx.HTTPError as e:
+            logger.error(f"Failed to get Instagram account counts: {e}")
+            raise ValueError(f"Failed to get Instagram account counts: {str(e)}")
 
 
 # Global Instagram OAuth provider instance
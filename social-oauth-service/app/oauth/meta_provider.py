@@ -0,0 +1,334 @@
+"""
+Shared base for OAuth providers on the Meta Graph API (Facebook, Instagram)
+"""
+import httpx
+from typing import Dict, Any
+import orjson
+import logging
+from urllib.parse import urlencode, quote
+from functools import cached_property
+from cachetools import TTLCache
+
+from app.oauth.base_provider import BaseOAuthProvider, _token_hash
+from app.utils.http import create_async_client
+from app.utils.graph_batch import GRAPH_BATCH_LIMIT, batch_form, get_subrequests, parse_batch
+
+logger = logging.getLogger(__name__)
+
+_loads = orjson.loads
+
+GRAPH_API_VERSION = "v18.0"
+
+
+class MetaGraphOAuthProvider(BaseOAuthProvider):
+    """Facebook Login token exchange, Graph API helpers and caches shared by Meta platforms"""
+    
+    # Scopes requested at login (set by subclasses)
+    _SCOPES = ()
+    _SCOPE_CSV = ''
+    
+    def __init__(self, platform: str, display_name: str):
+        super().__init__(platform)
+        self.display_name = display_name
+        self.aclient = create_async_client()
+        self.auth_url = f"https://www.facebook.com/{GRAPH_API_VERSION}/dialog/oauth"
+        self.token_url = f"https://graph.facebook.com/{GRAPH_API_VERSION}/oauth/access_token"
+        self.graph_api_url = f"https://graph.facebook.com/{GRAPH_API_VERSION}"
+        
+        # Per-instance so Facebook and Instagram lookups made with the same token don't collide
+        self._token_cache = TTLCache(maxsize=1024, ttl=300)  # Graph lookups per access token
+        self._validation_cache = TTLCache(maxsize=1024, ttl=60)  # validate_token results
+    
+    def get_scopes(self) -> tuple:
+        """Get required scopes"""
+        return self._SCOPES
+    
+    @cached_property
+    def _auth_url_prefix(self) -> str:
+        """Authorization URL without the state parameter (constant per process)"""
+        client_id = quote(self.client_id or '', safe='')
+        redirect_uri = quote(self.redirect_uri, safe='')
+        scope = quote(self._SCOPE_CSV, safe='')
+        return (
+            f"{self.auth_url}?client_id={client_id}&redirect_uri={redirect_uri}"
+            f"&scope={scope}&response_type=code"
+        )
+    
+    def get_authorization_url(self, state: str, **kwargs) -> str:
+        """
+        Get authorization URL (Facebook Login dialog)
+        
+        Args:
+            state: State token for CSRF protection
+            **kwargs: Additional parameters
+        
+        Returns:
+            Authorization URL
+        """
+        url = f"{self._auth_url_prefix}&state={quote(state, safe='')}"
+        logger.info("Generated %s auth URL for state: %s", self.display_name, state)
+        return url
+    
+    def _graph_get(self, path: str, params: Dict[str, Any], timeout: float = 30) -> Dict[str, Any]:
+        """
+        GET a Graph API path and parse the JSON response
+        
+        Raises:
+            httpx.HTTPError: On transport errors or non-2xx responses
+        """
+        response = self.http.get(f"{self.graph_api_url}/{path}", params=params, timeout=timeout)
+        response.raise_for_status()
+        return _loads(response.content)
+    
+    def _graph_batch(self, access_token: str, relative_urls: list) -> list:
+        """
+        Run several Graph API GET requests in one HTTP round trip (batch endpoint)
+        
+        Args:
+            access_token: Default token for subrequests that don't carry their own
+            relative_urls: Relative URLs, e.g. "{id}?fields=name&access_token=..."
+        
+        Returns:
+            List of (status_code, parsed body or None) in request order
+        """
+        results = []
+        for start in range(0, len(relative_urls), GRAPH_BATCH_LIMIT):
+            response = self.http.post(
+                self.graph_api_url,
+                data=batch_form(access_token, get_subrequests(relative_urls[start:start + GRAPH_BATCH_LIMIT])),
+                timeout=30
+            )
+            response.raise_for_status()
+            results.extend(parse_batch(response.content))
+        
+        return results
+    
+    async def _agraph_batch(self, access_token: str, relative_urls: list) -> list:
+        """
+        Async variant of _graph_batch
+        
+        Args:
+            access_token: Default token for subrequests that don't carry their own
+            relative_urls: Relative URLs, e.g. "{id}?fields=name&access_token=..."
+        
+        Returns:
+            List of (status_code, parsed body or None) in request order
+        """
+        results = []
+        for start in range(0, len(relative_urls), GRAPH_BATCH_LIMIT):
+            response = await self.aclient.post(
+                self.graph_api_url,
+                data=batch_form(access_token, get_subrequests(relative_urls[start:start + GRAPH_BATCH_LIMIT])),
+                timeout=30
+            )
+            response.raise_for_status()
+            results.extend(parse_batch(response.content))
+        
+        return results
+    
+    def exchange_code_for_token(self, code: str, **kwargs) -> Dict[str, Any]:
+        """
+        Exchange authorization code for access token
+        
+        Args:
+            code: Authorization code from callback
+        
+        Returns:
+            Token data with access_token, etc.
+        """
+        try:
+            # Code -> short-lived -> long-lived token (60 days) in one batch round trip
+            response = self.http.post(
+                self.graph_api_url,
+                data=self._token_exchange_batch(code),
+                timeout=30
+            )
+            response.raise_for_status()
+            long_token_data = self._parse_token_exchange_batch(response.content)
+            
+            logger.info("Exchanged code for long-lived %s token", self.display_name)
+            
+            return self._long_lived_token(long_token_data)
+            
+        except httpx.HTTPError as e:
+            logger.error(f"Failed to exchange code for {self.display_name} token: {e}")
+            if isinstance(e, httpx.HTTPStatusError):
+                logger.error(f"Response: {e.response.text}")
+            raise ValueError(f"Failed to obtain {self.display_name} access token: {str(e)}")
+    
+    async def aexchange_code_for_token(self, code: str, **kwargs) -> Dict[str, Any]:
+        """
+        Async variant of exchange_code_for_token
+        
+        Args:
+            code: Authorization code from callback
+        
+        Returns:
+            Token data with access_token, etc.
+        """
+        try:
+            response = await self.aclient.post(
+                self.graph_api_url,
+                data=self._token_exchange_batch(code)
+            )
+            response.raise_for_status()
+            long_token_data = self._parse_token_exchange_batch(response.content)
+            
+            logger.info("Exchanged code for long-lived %s token", self.display_name)
+            
+            return self._long_lived_token(long_token_data)
+            
+        except httpx.HTTPError as e:
+            logger.error(f"Failed to exchange code for {self.display_name} token: {e}")
+            if isinstance(e, httpx.HTTPStatusError):
+                logger.error(f"Response: {e.response.text}")
+            raise ValueError(f"Failed to obtain {self.display_name} access token: {str(e)}")
+    
+    def _token_exchange_batch(self, code: str) -> Dict[str, str]:
+        """
+        Form data for a Graph batch that exchanges a code for a long-lived token
+        
+        The second subrequest consumes the first one's access_token through a
+        JSONPath reference, so Facebook runs both steps server-side.
+        """
+        short_url = "oauth/access_token?" + urlencode({
+            'client_id': self.client_id,
+            'client_secret': self.client_secret,
+            'redirect_uri': self.redirect_uri,
+            'code': code
+        })
+        long_url = "oauth/access_token?" + urlencode({
+            'grant_type': 'fb_exchange_token',
+            'client_id': self.client_id,
+            'client_secret': self.client_secret
+        }) + "&fb_exchange_token={result=short:$.access_token}"
+        
+        # Batch requests need an access token; the app token works before any user token exists
+        return batch_form(self._app_token, [
+            {'method': 'GET', 'name': 'short', 'relative_url': short_url},
+            {'method': 'GET', 'relative_url': long_url}
+        ])
+    
+    def _parse_token_exchange_batch(self, content: bytes) -> Dict[str, Any]:
+        """Extract the long-lived token data from a token exchange batch response"""
+        results = parse_batch(content)
+        for code, body in results:
+            # Successful dependency subrequests are omitted (no code); failures keep their body
+            if code is not None and code != 200:
+                raise ValueError(f"{self.display_name} token exchange failed: {body}")
+        
+        last_code, last_body = results[-1] if results else (None, None)
+        if not last_body:
+            raise ValueError(f"{self.display_name} token exchange returned no token")
+        return last_body
+    
+    def _exchange_fb_long_lived(self, short_token: str) -> Dict[str, Any]:
+        """
+        Exchange a user token for a fresh long-lived (60 day) token
+        
+        Raises:
+            httpx.HTTPError: If the exchange request fails
+        """
+        token_data = self._graph_get(
+            "oauth/access_token",
+            params={
+                'grant_type': 'fb_exchange_token',
+                'client_id': self.client_id,
+                'client_secret': self.client_secret,
+                'fb_exchange_token': short_token
+            }
+        )
+        return self._long_lived_token(token_data)
+    
+    def _long_lived_token(self, token_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Normalize a long-lived token exchange response"""
+        return {
+            'access_token': token_data['access_token'],
+            'token_type': token_data.get('token_type', 'bearer'),
+            'expires_in': token_data.get('expires_in', 5184000),  # 60 days
+            'refresh_token': None  # Facebook uses token exchange, not refresh tokens
+        }
+    
+    @property
+    def _app_token(self) -> str:
+        """App access token (client_id|client_secret) for app-authenticated Graph calls"""
+        return f"{self.client_id}|{self.client_secret}"
+    
+    def refresh_access_token(self, refresh_token: str) -> Dict[str, Any]:
+        """
+        Refresh access token
+        
+        Note: Facebook uses token exchange, not refresh tokens
+        The 'refresh_token' parameter is actually the current access token
+        
+        Args:
+            refresh_token: Current access token to refresh
+        
+        Returns:
+            New token data
+        """
+        try:
+            token_data = self._exchange_fb_long_lived(refresh_token)
+            logger.info("%s access token refreshed successfully", self.display_name)
+            return token_data
+            
+        except httpx.HTTPError as e:
+            logger.error(f"Failed to refresh {self.display_name} token: {e}")
+            raise ValueError(f"Failed to refresh {self.display_name} access token: {str(e)}")
+    
+    def revoke_token(self, token: str) -> bool:
+        """
+        Revoke access token
+        
+        Cached lookups for the token are dropped immediately; the Graph API
+        call runs in the background, so this returns without waiting for it.
+        
+        Args:
+            token: Access token to revoke
+        
+        Returns:
+            True once the revocation has been queued
+        """
+        self.invalidate(token)
+        with self._token_cache_lock:
+            self._validation_cache.pop(_token_hash(token), None)
+        self._revoke_in_background(
+            f"{self.graph_api_url}/me/permissions",
+            params={'access_token': token}
+        )
+        return True
+    
+    def validate_token(self, access_token: str) -> bool:
+        """
+        Validate if an access token is still valid
+        
+        Args:
+            access_token: Token to validate
+        
+        Returns:
+            True if valid, False otherwise
+        """
+        key = _token_hash(access_token)
+        with self._token_cache_lock:
+            if key in self._validation_cache:
+                return self._validation_cache[key]
+        
+        try:
+            # debug_token is app-token authenticated and returns validity without a user read
+            response = self.http.get(
+                f"{self.graph_api_url}/debug_token",
+                params={
+                    'input_token': access_token,
+                    'access_token': self._app_token
+                },
+                timeout=10
+            )
+            if response.status_code != 200:
+                return False
+            is_valid = bool(_loads(response.content).get('data', {}).get('is_valid'))
+        except Exception:
+            return False
+        
+        with self._token_cache_lock:
+            self._validation_cache[key] = is_valid
+        return is_valid
@@ -4,18 +4,94 @@ OAuth Token Management - handles storage, retrieval, and refresh
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 import logging
-import json
+import threading
+import redis
+from cachetools import TTLCache
+from psycopg2.extras import Json
 
 from app.database import db
 from app.utils.encryption import token_encryption
+from app.utils import json_fast
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Redis channel used to evict cached connections in every worker
+CONNECTION_INVALIDATION_CHANNEL = "oauth:invalidate"
+
+# Columns read back for a connection. Listed explicitly so a migration that adds
+# a column doesn't change the result type of already-prepared statements.
+CONNECTION_COLUMNS = """
+    id, brand_id, platform, access_token, refresh_token, token_type, expires_at,
+    client_id, client_secret, platform_user_id, platform_username, account_name,
+    profile_picture_url, account_metadata, is_active, last_used_at, connection_error,
+    created_at, updated_at, oauth1_access_token, oauth1_access_token_secret, oauth1_enabled
+"""
+
 
 class TokenManager:
     """Manage OAuth tokens with automatic refresh"""
     
+    __slots__ = ('_cache', '_cache_lock', '_redis', '_listener')
+    
+    def __init__(self):
+        # Recently read connections keyed by (brand_id, platform, decrypt)
+        self._cache = TTLCache(maxsize=1024, ttl=settings.CONNECTION_CACHE_TTL_SECONDS)
+        self._cache_lock = threading.Lock()
+        self._redis = None
+        self._listener = None
+    
+    def _evict(self, brand_id: int, platform: str):
+        """Drop this process's cached copies of a connection"""
+        with self._cache_lock:
+            self._cache.pop((brand_id, platform, True), None)
+            self._cache.pop((brand_id, platform, False), None)
+    
+    def invalidate(self, brand_id: int, platform: str):
+        """
+        Evict a cached connection after it changes
+        
+        When Redis invalidation is enabled, other workers are notified too.
+        
+        Args:
+            brand_id: Brand ID
+            platform: Platform name
+        """
+        self._evict(brand_id, platform)
+        if self._redis is not None:
+            try:
+                self._redis.publish(CONNECTION_INVALIDATION_CHANNEL, f"{brand_id}:{platform}")
+            except redis.RedisError as e:
+                logger.warning(f"Failed to publish connection invalidation: {e}")
+    
+    def _on_invalidate_message(self, message):
+        """Handle an invalidation published by any worker"""
+        brand_id, _, platform = message['data'].decode().partition(':')
+        self._evict(int(brand_id), platform)
+    
+    def start_invalidation_listener(self):
+        """Subscribe to cross-worker cache invalidations (if CONNECTION_CACHE_REDIS_INVALIDATION is set)"""
+        if not settings.CONNECTION_CACHE_REDIS_INVALIDATION or self._listener is not None:
+            return
+        try:
+            client = redis.Redis.from_url(settings.REDIS_URL, db=settings.REDIS_DB)
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(**{CONNECTION_INVALIDATION_CHANNEL: self._on_invalidate_message})
+            self._listener = pubsub.run_in_thread(sleep_time=1, daemon=True)
+            self._redis = client
+            logger.info("Subscribed to connection cache invalidations")
+        except redis.RedisError as e:
+            logger.warning(f"Connection cache invalidation disabled, Redis unavailable: {e}")
+    
+    def stop_invalidation_listener(self):
+        """Stop the invalidation subscriber thread"""
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+        if self._redis is not None:
+            self._redis.close()
+            self._redis = None
+    
     def save_connection(
         self,
         brand_id: int,
@@ -53,113 +129,89 @@ class TokenManager:
             # Calculate expiration timestamp
             expires_at = datetime.now() + timedelta(seconds=expires_in) if expires_in else None
             
-            # Encrypt sensitive data
-            encrypted_access_token = token_encryption.encrypt_token(access_token)
-            encrypted_refresh_token = token_encryption.encrypt_token(refresh_token) if refresh_token else None
-            encrypted_client_secret = token_encryption.encrypt_token(client_secret)
-            
-            # Encrypt OAuth 1.0a credentials if provided
-            encrypted_oauth1_token = token_encryption.encrypt_token(oauth1_access_token) if oauth1_access_token else None
-            encrypted_oauth1_secret = token_encryption.encrypt_token(oauth1_access_token_secret) if oauth1_access_token_secret else None
+            # Encrypt sensitive data (OAuth 1.0a credentials only if provided)
+            (
+                encrypted_access_token,
+                encrypted_refresh_token,
+                encrypted_client_secret,
+                encrypted_oauth1_token,
+                encrypted_oauth1_secret
+            ) = token_encryption.encrypt_tokens([
+                access_token,
+                refresh_token,
+                client_secret,
+                oauth1_access_token,
+                oauth1_access_token_secret
+            ])
             oauth1_enabled = bool(oauth1_access_token and oauth1_access_token_secret)
             
-            # Convert account_metadata dict to JSON string for PostgreSQL
-            metadata_json = json.dumps(account_metadata) if account_metadata else None
+            # Bind account_metadata directly as JSONB
+            metadata_json = Json(account_metadata, dumps=json_fast.dumps) if account_metadata else None
             
-            # Log what we're about to save
-            if account_metadata:
-                logger.info(f"Saving connection for brand {brand_id} on {platform}:")
-                logger.info(f"  - Platform user ID: {platform_user_id}")
-                logger.info(f"  - Platform username: {platform_username}")
-                logger.info(f"  - Metadata keys: {list(account_metadata.keys())}")
+            # Log what we're about to save (skipped entirely unless INFO is enabled)
+            if account_metadata and logger.isEnabledFor(logging.INFO):
+                logger.info("Saving connection for brand %s on %s:", brand_id, platform)
+                logger.info("  - Platform user ID: %s", platform_user_id)
+                logger.info("  - Platform username: %s", platform_username)
+                logger.info("  - Metadata keys: %s", list(account_metadata.keys()))
                 if platform == 'instagram':
-                    logger.info(f"  - Has all_accounts: {bool(account_metadata.get('all_accounts'))}")
-                    if account_metadata.get('all_accounts'):
-                        logger.info(f"  - Number of accounts: {len(account_metadata.get('all_accounts'))}")
+                    all_accounts = account_metadata.get('all_accounts')
+                    logger.info("  - Has all_accounts: %s", bool(all_accounts))
+                    if all_accounts:
+                        logger.info("  - Number of accounts: %d", len(all_accounts))
                 elif platform == 'facebook':
-                    logger.info(f"  - Has pages: {bool(account_metadata.get('pages'))}")
-                    if account_metadata.get('pages'):
-                        logger.info(f"  - Number of pages: {len(account_metadata.get('pages'))}")
+                    pages = account_metadata.get('pages')
+                    logger.info("  - Has pages: %s", bool(pages))
+                    if pages:
+                        logger.info("  - Number of pages: %d", len(pages))
             
-            # Check if connection already exists
-            existing = db.execute_query(
-                """
-                SELECT id FROM social_connections 
-                WHERE brand_id = %s AND platform = %s
+            # Insert, or update the brand's existing connection, in one round trip
+            result = db.execute_insert(
+                f"""
+                INSERT INTO social_connections (
+                    brand_id, platform, access_token, refresh_token,
+                    expires_at, client_id, client_secret,
+                    platform_user_id, platform_username, account_metadata,
+                    oauth1_access_token, oauth1_access_token_secret, oauth1_enabled
+                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                ON CONFLICT (brand_id, platform) DO UPDATE SET
+                    access_token = EXCLUDED.access_token,
+                    refresh_token = EXCLUDED.refresh_token,
+                    expires_at = EXCLUDED.expires_at,
+                    client_id = EXCLUDED.client_id,
+                    client_secret = EXCLUDED.client_secret,
+                    platform_user_id = EXCLUDED.platform_user_id,
+                    platform_username = EXCLUDED.platform_username,
+                    account_metadata = EXCLUDED.account_metadata,
+                    oauth1_access_token = EXCLUDED.oauth1_access_token,
+                    oauth1_access_token_secret = EXCLUDED.oauth1_access_token_secret,
+                    oauth1_enabled = EXCLUDED.oauth1_enabled,
+                    is_active = true,
+                    connection_error = NULL,
+                    updated_at = CURRENT_TIMESTAMP
+                RETURNING {CONNECTION_COLUMNS}
                 """,
-                (brand_id, platform)
+                (
+                    brand_id,
+                    platform,
+                    encrypted_access_token,
+                    encrypted_refresh_token,
+                    expires_at,
+                    client_id,
+                    encrypted_client_secret,
+                    platform_user_id,
+                    platform_username,
+                    metadata_json,
+                    encrypted_oauth1_token,
+                    encrypted_oauth1_secret,
+                    oauth1_enabled
+                ),
+                prepare=True
             )
             
-            if existing and len(existing) > 0:
-                # Update existing connection
-                result = db.execute_update(
-                    """
-                    UPDATE social_connections SET
-                        access_token = %s,
-                        refresh_token = %s,
-                        expires_at = %s,
-                        client_id = %s,
-                        client_secret = %s,
-                        platform_user_id = %s,
-                        platform_username = %s,
-                        account_metadata = %s,
-                        oauth1_access_token = %s,
-                        oauth1_access_token_secret = %s,
-                        oauth1_enabled = %s,
-                        is_active = true,
-                        connection_error = NULL,
-                        updated_at = CURRENT_TIMESTAMP
-                    WHERE brand_id = %s AND platform = %s
-                    RETURNING *
-                    """,
-                    (
-                        encrypted_access_token,
-                        encrypted_refresh_token,
-                        expires_at,
-                        client_id,
-                        encrypted_client_secret,
-                        platform_user_id,
-                        platform_username,
-                        metadata_json,
-                        encrypted_oauth1_token,
-                        encrypted_oauth1_secret,
-                        oauth1_enabled,
-                        brand_id,
-                        platform
-                    ),
-                    returning=True
-                )
-            else:
-                # Insert new connection
-                result = db.execute_insert(
-                    """
-                    INSERT INTO social_connections (
-                        brand_id, platform, access_token, refresh_token,
-                        expires_at, client_id, client_secret,
-                        platform_user_id, platform_username, account_metadata,
-                        oauth1_access_token, oauth1_access_token_secret, oauth1_enabled
-                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    RETURNING *
-                    """,
-                    (
-                        brand_id,
-                        platform,
-                        encrypted_access_token,
-                        encrypted_refresh_token,
-                        expires_at,
-                        client_id,
-                        encrypted_client_secret,
-                        platform_user_id,
-                        platform_username,
-                        metadata_json,
-                        encrypted_oauth1_token,
-                        encrypted_oauth1_secret,
-                        oauth1_enabled
-                    )
-                )
-            
-            logger.info(f"Saved OAuth connection for brand {brand_id} on {platform}")
-            return dict(result) if result else None
+            self.invalidate(brand_id, platform)
+            logger.info("Saved OAuth connection for brand %s on %s", brand_id, platform)
+            return result
             
         except Exception as e:
             logger.error(f"Failed to save connection: {e}")
@@ -177,36 +229,36 @@ class TokenManager:
         Returns:
             Connection data with decrypted tokens or None
         """
+        key = (brand_id, platform, decrypt)
+        with self._cache_lock:
+            cached = self._cache.get(key)
+        if cached is not None:
+            return dict(cached)
+        
         try:
-            result = db.execute_query(
-                """
-                SELECT * FROM social_connections
+            result = db.execute_one(
+                f"""
+                SELECT {CONNECTION_COLUMNS} FROM social_connections
                 WHERE brand_id = %s AND platform = %s AND is_active = true
+                LIMIT 1
                 """,
-                (brand_id, platform)
+                (brand_id, platform),
+                prepare=True
             )
             
-            if not result or len(result) == 0:
+            if not result:
                 return None
             
-            connection = dict(result[0])
-            
-            # Decrypt sensitive fields if requested
-            if decrypt:
-                connection = token_encryption.decrypt_dict(connection)
+            # RealDictRow is already a dict; decrypt_dict makes its own copy
+            connection = token_encryption.decrypt_dict(result) if decrypt else result
             
-            # Parse account_metadata from JSON string to dict
-            if connection.get('account_metadata'):
-                if isinstance(connection['account_metadata'], str):
-                    try:
-                        connection['account_metadata'] = json.loads(connection['account_metadata'])
-                    except json.JSONDecodeError as e:
-                        logger.error(f"Failed to parse account_metadata JSON: {e}")
-                        connection['account_metadata'] = {}
-            else:
+            # account_metadata (JSONB) is already decoded to a dict by psycopg2
+            if not connection.get('account_metadata'):
                 connection['account_metadata'] = {}
             
-            return connection
+            with self._cache_lock:
+                self._cache[key] = connection
+            return dict(connection)
             
         except Exception as e:
             logger.error(f"Failed to get connection: {e}")
@@ -216,21 +268,20 @@ class TokenManager:
         """Get all OAuth connections for a brand"""
         try:
             results = db.execute_query(
-                """
-                SELECT * FROM social_connections
+                f"""
+                SELECT {CONNECTION_COLUMNS} FROM social_connections
                 WHERE brand_id = %s AND is_active = true
                 ORDER BY created_at DESC
                 """,
                 (brand_id,)
             )
             
-            connections = [dict(row) for row in results]
-            
             # Decrypt if requested (but usually not needed for listing)
             if decrypt:
-                connections = [token_encryption.decrypt_dict(conn) for conn in connections]
+                return [token_encryption.decrypt_dict(row) for row in results]
             
-            return connections
+            # RealDictRows are dicts already, no need to copy them for listing
+            return results
             
         except Exception as e:
             logger.error(f"Failed to get connections: {e}")
@@ -249,13 +300,40 @@ class TokenManager:
         if not connection.get('expires_at'):
             return False
         
+        # expires_at is a TIMESTAMP column, so psycopg2 already returns a datetime
         expires_at = connection['expires_at']
-        if isinstance(expires_at, str):
-            expires_at = datetime.fromisoformat(expires_at)
         
         threshold = timedelta(minutes=settings.TOKEN_REFRESH_THRESHOLD_MINUTES)
         return datetime.now() + threshold >= expires_at
     
+    def needs_refresh_bulk(self, brand_ids: Optional[list] = None) -> list:
+        """
+        Find all active connections whose tokens need refresh in one query
+        
+        Same rule as needs_refresh, evaluated by Postgres for every row at once.
+        
+        Args:
+            brand_ids: Limit the check to these brands (all brands if None)
+        
+        Returns:
+            List of (brand_id, platform) tuples
+        """
+        cutoff = datetime.now() + timedelta(minutes=settings.TOKEN_REFRESH_THRESHOLD_MINUTES)
+        query = """
+            SELECT brand_id, platform FROM social_connections
+            WHERE is_active = true AND expires_at IS NOT NULL AND expires_at <= %s
+        """
+        params = [cutoff]
+        if brand_ids is not None:
+            query += " AND brand_id = ANY(%s)"
+            params.append(list(brand_ids))
+        
+        try:
+            return db.execute_query(query, tuple(params), cursor_factory=None)
+        except Exception as e:
+            logger.error("Failed to check connections for refresh: %s", e)
+            return []
+    
     def update_tokens(
         self,
         brand_id: int,
@@ -280,8 +358,9 @@ class TokenManager:
         try:
             expires_at = datetime.now() + timedelta(seconds=expires_in) if expires_in else None
             
-            encrypted_access_token = token_encryption.encrypt_token(access_token)
-            encrypted_refresh_token = token_encryption.encrypt_token(refresh_token) if refresh_token else None
+            encrypted_access_token, encrypted_refresh_token = token_encryption.encrypt_tokens(
+                [access_token, refresh_token or None]
+            )
             
             query = """
                 UPDATE social_connections SET
@@ -300,15 +379,75 @@ class TokenManager:
             query += " WHERE brand_id = %s AND platform = %s"
             params.extend([brand_id, platform])
             
-            db.execute_update(query, tuple(params))
+            db.execute_update(query, tuple(params), prepare=True)
             
-            logger.info(f"Updated tokens for brand {brand_id} on {platform}")
+            self.invalidate(brand_id, platform)
+            logger.info("Updated tokens for brand %s on %s", brand_id, platform)
             return True
             
         except Exception as e:
             logger.error(f"Failed to update tokens: {e}")
             return False
     
+    def update_tokens_bulk(self, rows: list) -> int:
+        """
+        Update tokens for many connections in a single statement
+        
+        Args:
+            rows: (brand_id, platform, access_token, refresh_token, expires_in) tuples;
+                a None refresh_token keeps the stored one
+        
+        Returns:
+            Number of connections updated (0 on failure)
+        """
+        if not rows:
+            return 0
+        
+        try:
+            now = datetime.now()
+            # One batched encryption pass for every access/refresh token pair
+            encrypted = token_encryption.encrypt_tokens([
+                token
+                for _, _, access_token, refresh_token, _ in rows
+                for token in (access_token, refresh_token or None)
+            ])
+            values = [
+                (
+                    brand_id,
+                    platform,
+                    encrypted[2 * i],
+                    now + timedelta(seconds=expires_in) if expires_in else None,
+                    encrypted[2 * i + 1]
+                )
+                for i, (brand_id, platform, _, _, expires_in) in enumerate(rows)
+            ]
+            
+            updated = db.execute_values(
+                """
+                UPDATE social_connections SET
+                    access_token = data.t,
+                    expires_at = data.e,
+                    refresh_token = COALESCE(data.r, social_connections.refresh_token),
+                    last_used_at = CURRENT_TIMESTAMP,
+                    updated_at = CURRENT_TIMESTAMP
+                FROM (VALUES %s) AS data(brand_id, platform, t, e, r)
+                WHERE social_connections.brand_id = data.brand_id
+                  AND social_connections.platform = data.platform
+                """,
+                values,
+                template="(%s, %s, %s, %s::timestamp, %s)",
+                page_size=len(values)
+            )
+            
+            for brand_id, platform, *_ in rows:
+                self.invalidate(brand_id, platform)
+            logger.info("Updated tokens for %d connections", updated)
+            return updated
+            
+        except Exception as e:
+            logger.error("Failed to update tokens in bulk for %d connections: %s", len(rows), e)
+            return 0
+    
     def mark_error(self, brand_id: int, platform: str, error: str):
         """Mark connection as having an error"""
         try:
@@ -319,8 +458,10 @@ class TokenManager:
                     updated_at = CURRENT_TIMESTAMP
                 WHERE brand_id = %s AND platform = %s
                 """,
-                (error, brand_id, platform)
+                (error, brand_id, platform),
+                prepare=True
             )
+            self.invalidate(brand_id, platform)
             logger.warning(f"Marked connection error for brand {brand_id} on {platform}: {error}")
         except Exception as e:
             logger.error(f"Failed to mark error: {e}")
@@ -335,8 +476,10 @@ class TokenManager:
                     updated_at = CURRENT_TIMESTAMP
                 WHERE brand_id = %s AND platform = %s
                 """,
-                (brand_id, platform)
+                (brand_id, platform),
+                prepare=True
             )
+            self.invalidate(brand_id, platform)
             logger.info(f"Disconnected brand {brand_id} from {platform}")
             return True
         except Exception as e:
@@ -1,25 +1,37 @@
 """
 Twitter/X OAuth Provider (OAuth 2.0 with PKCE)
 """
-import requests
+import httpx
 from typing import Dict, Any
 import logging
 from urllib.parse import urlencode
-import secrets
-import hashlib
-import base64
 
 from app.oauth.base_provider import BaseOAuthProvider
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+USER_AGENT = 'coffee-caption/1.0'
+
 
 class TwitterOAuthProvider(BaseOAuthProvider):
     """Twitter OAuth provider using OAuth 2.0 with PKCE"""
     
+    _SCOPES = (
+        'tweet.read',          # Read tweets
+        'tweet.write',         # Post tweets
+        'tweet.moderate.write',# Moderate tweets
+        'users.read',          # Read user profile
+        'offline.access',      # Get refresh token
+        'media.write'          # Upload media (required for images/videos)
+    )
+    _SCOPE_STR = ' '.join(_SCOPES)
+    _FORM_HEADERS = {'Content-Type': 'application/x-www-form-urlencoded'}
+    
     def __init__(self):
         super().__init__('twitter')
+        # Token and user calls go through the shared keep-alive client (self.http)
+        self.http.headers['User-Agent'] = USER_AGENT
         self.auth_url = "https://twitter.com/i/oauth2/authorize"
         self.token_url = "https://api.twitter.com/2/oauth2/token"
         self.api_url = "https://api.twitter.com/2"
@@ -29,21 +41,16 @@ class TwitterOAuthProvider(BaseOAuthProvider):
         self.client_id = settings.TWITTER_CLIENT_ID
         self.client_secret = settings.TWITTER_CLIENT_SECRET
         self.redirect_uri = settings.TWITTER_REDIRECT_URI or f"{settings.BASE_CALLBACK_URL}/api/v1/oauth/twitter/callback"
+        # Twitter requires Basic Auth with client credentials on token endpoints
+        self._auth = (self.client_id, self.client_secret)
     
     def requires_pkce(self) -> bool:
         """Twitter requires PKCE for OAuth 2.0"""
         return True
     
-    def get_scopes(self) -> list:
+    def get_scopes(self) -> tuple:
         """Get required Twitter scopes"""
-        return [
-            'tweet.read',          # Read tweets
-            'tweet.write',         # Post tweets
-            'tweet.moderate.write',# Moderate tweets
-            'users.read',          # Read user profile
-            'offline.access',      # Get refresh token
-            'media.write'          # Upload media (required for images/videos)
-        ]
+        return self._SCOPES
     
     def get_authorization_url(self, state: str, **kwargs) -> str:
         """
@@ -67,15 +74,15 @@ class TwitterOAuthProvider(BaseOAuthProvider):
             'response_type': 'code',
             'client_id': self.client_id,
             'redirect_uri': self.redirect_uri,
-            'scope': ' '.join(self.get_scopes()),
+            'scope': self._SCOPE_STR,
             'state': state,
             'code_challenge': code_challenge,
             'code_challenge_method': 'S256'
         }
         
         url = f"{self.auth_url}?{urlencode(params)}"
-        logger.info(f"Generated Twitter auth URL for state: {state}")
-        logger.info(f"Redirect URI: {self.redirect_uri}")
+        logger.info("Generated Twitter auth URL for state: %s", state)
+        logger.info("Redirect URI: %s", self.redirect_uri)
         return url
     
     def exchange_code_for_token(self, code: str, **kwargs) -> Dict[str, Any]:
@@ -94,7 +101,7 @@ class TwitterOAuthProvider(BaseOAuthProvider):
             logger.error("No code_verifier provided for Twitter token exchange")
             raise ValueError("PKCE code_verifier is required for Twitter token exchange")
         
-        logger.info(f"Exchanging Twitter authorization code for access token")
+        logger.info("Exchanging Twitter authorization code for access token")
         
         try:
             # Prepare token request
@@ -106,14 +113,11 @@ class TwitterOAuthProvider(BaseOAuthProvider):
                 'code_verifier': code_verifier
             }
             
-            # Twitter requires Basic Auth with client credentials
-            auth = (self.client_id, self.client_secret)
-            
-            response = requests.post(
+            response = self.http.post(
                 self.token_url,
                 data=data,
-                auth=auth,
-                headers={'Content-Type': 'application/x-www-form-urlencoded'},
+                auth=self._auth,
+                headers=self._FORM_HEADERS,
                 timeout=30
             )
             
@@ -127,12 +131,12 @@ class TwitterOAuthProvider(BaseOAuthProvider):
                 'token_type': token_data.get('token_type', 'bearer'),
                 'expires_in': token_data.get('expires_in', 7200),
                 'refresh_token': token_data.get('refresh_token'),
-                'scope': token_data.get('scope', ' '.join(self.get_scopes()))
+                'scope': token_data.get('scope', self._SCOPE_STR)
             }
             
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"Failed to exchange code for Twitter token: {e}")
-            if hasattr(e, 'response') and e.response:
+            if isinstance(e, httpx.HTTPStatusError):
                 logger.error(f"Response: {e.response.text}")
             raise ValueError(f"Failed to obtain Twitter access token: {str(e)}")
     
@@ -153,13 +157,11 @@ class TwitterOAuthProvider(BaseOAuthProvider):
                 'client_id': self.client_id
             }
             
-            auth = (self.client_id, self.client_secret)
-            
-            response = requests.post(
+            response = self.http.post(
                 self.token_url,
                 data=data,
-                auth=auth,
-                headers={'Content-Type': 'application/x-www-form-urlencoded'},
+                auth=self._auth,
+                headers=self._FORM_HEADERS,
                 timeout=30
             )
             
@@ -176,7 +178,7 @@ class TwitterOAuthProvider(BaseOAuthProvider):
                 'scope': token_data.get('scope')
             }
             
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"Failed to refresh Twitter token: {e}")
             raise ValueError(f"Failed to refresh Twitter access token: {str(e)}")
     
@@ -192,7 +194,7 @@ class TwitterOAuthProvider(BaseOAuthProvider):
         """
         try:
             # Get authenticated user info
-            response = requests.get(
+            response = self.http.get(
                 f"{self.api_url}/users/me",
                 headers={
                     'Authorization': f'Bearer {access_token}',
@@ -208,11 +210,11 @@ class TwitterOAuthProvider(BaseOAuthProvider):
             data = response.json()
             user_data = data.get('data', {})
             
-            logger.info(f"Retrieved Twitter user info for: {user_data.get('username')}")
-            logger.info(f"  - User ID: {user_data.get('id')}")
-            logger.info(f"  - Name: {user_data.get('name')}")
-            logger.info(f"  - Username: @{user_data.get('username')}")
-            logger.info(f"  - Verified: {user_data.get('verified', False)}")
+            logger.info("Retrieved Twitter user info for: %s", user_data.get('username'))
+            logger.info("  - User ID: %s", user_data.get('id'))
+            logger.info("  - Name: %s", user_data.get('name'))
+            logger.info("  - Username: @%s", user_data.get('username'))
+            logger.info("  - Verified: %s", user_data.get('verified', False))
             
             return {
                 'user_id': user_data.get('id'),
@@ -223,9 +225,9 @@ class TwitterOAuthProvider(BaseOAuthProvider):
                 'platform': 'twitter'
             }
             
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"Failed to get Twitter user info: {e}")
-            if hasattr(e, 'response') and e.response:
+            if isinstance(e, httpx.HTTPStatusError):
                 logger.error(f"Response: {e.response.text}")
             raise ValueError(f"Failed to get Twitter user information: {str(e)}")
     
@@ -246,13 +248,11 @@ class TwitterOAuthProvider(BaseOAuthProvider):
                 'client_id': self.client_id
             }
             
-            auth = (self.client_id, self.client_secret)
-            
-            response = requests.post(
+            response = self.http.post(
                 f"{self.api_url}/oauth2/revoke",
                 data=data,
-                auth=auth,
-                headers={'Content-Type': 'application/x-www-form-urlencoded'},
+                auth=self._auth,
+                headers=self._FORM_HEADERS,
                 timeout=10
             )
             
@@ -2,14 +2,34 @@
 Base Publisher - abstract class for platform-specific publishing
 """
 from abc import ABC, abstractmethod
+import hashlib
 from typing import Dict, Any, Optional
 import logging
 from datetime import datetime
+from functools import lru_cache
+from io import BytesIO
 
-from app.utils.retry import retry_with_backoff
+from PIL import Image, UnidentifiedImageError
+
+from app.utils.retry import retry_with_backoff, is_transient_error
+from app.utils.http import create_client
+from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+_VALID_IMAGE_SUFFIXES = ('.jpg', '.jpeg', '.png', '.gif', '.webp')
+
+# Shared keep-alive client for downloading source images
+_http = create_client(max_connections=50)
+
+
+@lru_cache(maxsize=2048)
+def _is_valid_image_url(image_url: str) -> bool:
+    """Cached image URL check; the same URLs come back on retries and across platforms"""
+    # Match the path's extension, ignoring any query string; only the tail needs lowering
+    path = image_url.split('?', 1)[0]
+    return path[-6:].lower().endswith(_VALID_IMAGE_SUFFIXES)
+
 
 class BasePublisher(ABC):
     """Base class for social media publishers"""
@@ -17,6 +37,11 @@ class BasePublisher(ABC):
     def __init__(self, platform: str):
         self.platform = platform
     
+    @staticmethod
+    def _token_key(access_token: str) -> str:
+        """Cache key for an access token, so raw tokens are never held as keys"""
+        return hashlib.sha256(access_token.encode()).hexdigest()
+    
     @abstractmethod
     def publish_post(
         self,
@@ -81,9 +106,8 @@ class BasePublisher(ABC):
         if not hashtags:
             return caption
         
-        # Remove # prefix if present
-        clean_hashtags = [tag.lstrip('#') for tag in hashtags]
-        hashtag_str = ' '.join([f'#{tag}' for tag in clean_hashtags])
+        # Normalize to exactly one # prefix in a single pass
+        hashtag_str = ' '.join('#' + tag.lstrip('#') for tag in hashtags)
         
         return f"{caption}\n\n{hashtag_str}"
     
@@ -97,11 +121,76 @@ class BasePublisher(ABC):
         Returns:
             True if valid
         """
-        if not image_url:
-            return False
+        return bool(image_url) and _is_valid_image_url(image_url)
+    
+    def _fetch_image(self, url: str, max_bytes: int) -> bytes:
+        """
+        Download an image, refusing anything larger than the platform accepts
+        
+        A HEAD request checks Content-Length first, so oversized images are
+        rejected without being downloaded. The body is then streamed and the
+        limit enforced again for servers that don't report a length.
+        
+        Args:
+            url: Image URL
+            max_bytes: Largest image the platform accepts
+        
+        Returns:
+            Image bytes
+        
+        Raises:
+            ValueError: If the image exceeds max_bytes
+            httpx.HTTPError: If the download fails
+        """
+        head = _http.head(url, follow_redirects=True)
+        if head.is_success:
+            declared = int(head.headers.get('content-length') or 0)
+            if declared > max_bytes:
+                raise ValueError(f"Image too large: {declared} bytes (max {max_bytes})")
+        
+        data = bytearray()
+        with _http.stream("GET", url, follow_redirects=True) as response:
+            response.raise_for_status()
+            for chunk in response.iter_bytes():
+                data += chunk
+                if len(data) > max_bytes:
+                    raise ValueError(f"Image too large: more than {max_bytes} bytes")
+        return bytes(data)
+    
+    def _maybe_transcode(self, image_data: bytes) -> bytes:
+        """
+        Re-encode a large image as a progressive JPEG to cut upload size
+        
+        Images at or under IMAGE_TRANSCODE_THRESHOLD_BYTES, animations,
+        images with transparency and anything Pillow can't read are left
+        untouched, as is any result that doesn't come out smaller.
+        
+        Args:
+            image_data: Binary image data
+        
+        Returns:
+            JPEG bytes, or the original bytes when transcoding doesn't help
+        """
+        if len(image_data) <= settings.IMAGE_TRANSCODE_THRESHOLD_BYTES:
+            return image_data
         
-        valid_extensions = ['.jpg', '.jpeg', '.png', '.gif', '.webp']
-        return any(image_url.lower().endswith(ext) for ext in valid_extensions)
+        try:
+            with Image.open(BytesIO(image_data)) as image:
+                if getattr(image, 'n_frames', 1) > 1 or image.mode in ('RGBA', 'LA', 'PA') or 'transparency' in image.info:
+                    return image_data
+                
+                output = BytesIO()
+                image.convert('RGB').save(output, format='JPEG', quality=85, optimize=True, progressive=True)
+        except (UnidentifiedImageError, OSError) as e:
+            logger.warning("Skipping image transcode: %s", e)
+            return image_data
+        
+        transcoded = output.getvalue()
+        if len(transcoded) >= len(image_data):
+            return image_data
+        
+        logger.info("Transcoded image to JPEG: %d -> %d bytes", len(image_data), len(transcoded))
+        return transcoded
     
     def record_publish_result(
         self,
@@ -113,40 +202,30 @@ class BasePublisher(ABC):
         """
         Record publishing result to database
         
+        The row is queued and inserted in the background, so publishing
+        doesn't wait on the database.
+        
         Args:
             brand_id: Brand ID
             scheduled_post_id: Scheduled post ID (if applicable)
             result: Publishing result data
             success: Whether publishing was successful
         """
-        from app.database import db
-        
-        try:
-            db.execute_insert(
-                """
-                INSERT INTO post_history (
-                    scheduled_post_id, brand_id, platform,
-                    platform_post_id, post_url, caption,
-                    status, error_message, published_at
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                """,
-                (
-                    scheduled_post_id,
-                    brand_id,
-                    self.platform,
-                    result.get('post_id'),
-                    result.get('url'),
-                    result.get('caption'),
-                    'success' if success else 'failed',
-                    result.get('error'),
-                    datetime.now()
-                ),
-                returning=False
-            )
-        except Exception as e:
-            logger.error(f"Failed to record publish result: {e}")
+        from app.scheduler.maintenance import queue_post_history
+        
+        queue_post_history((
+            scheduled_post_id,
+            brand_id,
+            self.platform,
+            result.get('post_id'),
+            result.get('url'),
+            result.get('caption'),
+            'success' if success else 'failed',
+            result.get('error'),
+            datetime.now()
+        ))
     
-    @retry_with_backoff(max_retries=3, backoff_seconds=5)
+    @retry_with_backoff(max_retries=3, backoff_seconds=5, retry_if=is_transient_error)
     def publish_with_retry(
         self,
         access_token: str,
@@ -155,7 +234,10 @@ class BasePublisher(ABC):
         **kwargs
     ) -> Dict[str, Any]:
         """
-        Publish post with automatic retry on failure
+        Publish post with automatic retry on transient failures
+        
+        Network errors and 429/5xx responses are retried with backoff;
+        other errors (e.g. 400s) are raised without waiting.
         
         Args:
             access_token: OAuth access token
@@ -4,20 +4,40 @@ Facebook Publisher - handles posting to Facebook via Graph API
 import requests
 from typing import Dict, Any, Optional
 import logging
+import threading
 import base64
 from io import BytesIO
+from requests_toolbelt.multipart.encoder import MultipartEncoder
+from cachetools import TTLCache
 
 from app.publishers.base_publisher import BasePublisher
+from app.publishers.graph_client import GRAPH_API_URL, graph_client, graph_endpoint
+from app.utils import json_fast
+from app.utils.retry import retry_on_rate_limit
 
 logger = logging.getLogger(__name__)
 
+POST_STATUS_FIELDS = 'id,message,created_time,permalink_url,likes.summary(true),comments.summary(true),shares'
+PAGE_INFO_FIELDS = 'id,name,username,category,fan_count,link'
+DEFAULT_PAGE_METRICS = [
+    'page_impressions',
+    'page_engaged_users',
+    'page_post_engagements',
+    'page_fans'
+]
+
 
 class FacebookPublisher(BasePublisher):
     """Publisher for Facebook using Meta Graph API"""
     
     def __init__(self):
         super().__init__('facebook')
-        self.graph_api_url = "https://graph.facebook.com/v18.0"
+        self.graph_api_url = GRAPH_API_URL
+        self.session = graph_client  # Pooled, usage-governed connections to graph.facebook.com
+        # Read-side results for polling dashboards, keyed by (token hash, object ID, fields)
+        self._status_cache = TTLCache(maxsize=10_000, ttl=30)
+        self._insights_cache = TTLCache(maxsize=10_000, ttl=300)
+        self._read_cache_lock = threading.RLock()
     
     def publish_post(
         self,
@@ -35,7 +55,7 @@ class FacebookPublisher(BasePublisher):
             caption: Post caption/message
             image_url: URL of image (optional)
             image_data: Binary image data (optional)
-            **kwargs: Additional parameters (page_id required)
+            **kwargs: Additional parameters (page_id required, skip_transcode to upload bytes as-is)
         
         Returns:
             dict with post_id and url
@@ -44,6 +64,9 @@ class FacebookPublisher(BasePublisher):
         if not page_id:
             raise ValueError("Facebook publishing requires page_id")
         
+        if image_data and not kwargs.get('skip_transcode'):
+            image_data = self._maybe_transcode(image_data)
+        
         try:
             # Determine if this is a photo or text post
             if image_data or (image_url and self.validate_image_url(image_url)):
@@ -64,6 +87,7 @@ class FacebookPublisher(BasePublisher):
             logger.error(error_msg)
             raise ValueError(error_msg)
     
+    @retry_on_rate_limit()
     def _publish_photo_post(
         self,
         access_token: str,
@@ -85,31 +109,29 @@ class FacebookPublisher(BasePublisher):
         Returns:
             Publishing result
         """
-        logger.info(f"Publishing photo post to Facebook Page {page_id}")
+        logger.info("Publishing photo post to Facebook Page %s", page_id)
         
         # Check if we have binary image data or URL
         if image_data:
-            # Upload binary image data using multipart/form-data
+            # Stream the multipart/form-data body instead of assembling it in memory
             logger.info("Uploading binary image data to Facebook")
-            files = {
-                'source': ('image.jpg', BytesIO(image_data), 'image/jpeg')
-            }
-            data = {
+            encoder = MultipartEncoder(fields={
                 'caption': caption,
-                'access_token': access_token
-            }
+                'access_token': access_token,
+                'source': ('image.jpg', BytesIO(image_data), 'image/jpeg')
+            })
             
-            response = requests.post(
-                f"{self.graph_api_url}/{page_id}/photos",
-                data=data,
-                files=files,
+            response = self.session.post(
+                graph_endpoint(page_id, 'photos'),
+                data=encoder,
+                headers={'Content-Type': encoder.content_type},
                 timeout=60
             )
         else:
             # Use URL-based upload
-            logger.info(f"Uploading image from URL to Facebook")
-            response = requests.post(
-                f"{self.graph_api_url}/{page_id}/photos",
+            logger.info("Uploading image from URL to Facebook")
+            response = self.session.post(
+                graph_endpoint(page_id, 'photos'),
                 data={
                     'url': image_url,
                     'caption': caption,
@@ -119,10 +141,10 @@ class FacebookPublisher(BasePublisher):
             )
         
         response.raise_for_status()
-        data = response.json()
+        data = json_fast.loads(response.content)
         post_id = data['id']
         
-        logger.info(f"Facebook photo post published successfully: {post_id}")
+        logger.info("Facebook photo post published successfully: %s", post_id)
         
         # Construct post URL
         post_url = f"https://www.facebook.com/{post_id}"
@@ -136,6 +158,7 @@ class FacebookPublisher(BasePublisher):
             'status': 'published'
         }
     
+    @retry_on_rate_limit()
     def _publish_text_post(
         self,
         access_token: str,
@@ -153,10 +176,10 @@ class FacebookPublisher(BasePublisher):
         Returns:
             Publishing result
         """
-        logger.info(f"Publishing text post to Facebook Page {page_id}")
+        logger.info("Publishing text post to Facebook Page %s", page_id)
         
-        response = requests.post(
-            f"{self.graph_api_url}/{page_id}/feed",
+        response = self.session.post(
+            graph_endpoint(page_id, 'feed'),
             data={
                 'message': caption,
                 'access_token': access_token
@@ -164,13 +187,13 @@ class FacebookPublisher(BasePublisher):
             timeout=60
         )
         response.raise_for_status()
-        data = response.json()
+        data = json_fast.loads(response.content)
         post_id = data['id']
         
-        logger.info(f"Facebook text post published successfully: {post_id}")
+        logger.info("Facebook text post published successfully: %s", post_id)
         
         # Construct post URL
-        post_url = f"https://www.facebook.com/{post_id.replace('_', '/posts/')}"
+        post_url = self._post_url(post_id)
         
         return {
             'post_id': post_id,
@@ -180,6 +203,14 @@ class FacebookPublisher(BasePublisher):
             'status': 'published'
         }
     
+    @staticmethod
+    def _post_url(post_id: str) -> str:
+        """Permalink for a composite "{page_id}_{post_id}" feed post ID"""
+        page_part, _, post_part = post_id.partition('_')
+        if post_part:
+            return f"https://www.facebook.com/{page_part}/posts/{post_part}"
+        return f"https://www.facebook.com/{post_id}"
+    
     def delete_post(self, access_token: str, post_id: str) -> bool:
         """
         Delete Facebook post
@@ -192,18 +223,25 @@ class FacebookPublisher(BasePublisher):
             True if successful
         """
         try:
-            response = requests.delete(
+            response = self.session.delete(
                 f"{self.graph_api_url}/{post_id}",
                 params={'access_token': access_token},
                 timeout=30
             )
             response.raise_for_status()
-            logger.info(f"Facebook post {post_id} deleted successfully")
+            logger.info("Facebook post %s deleted successfully", post_id)
+            self._forget_post(post_id)
             return True
         except Exception as e:
-            logger.error(f"Failed to delete Facebook post: {e}")
+            logger.error("Failed to delete Facebook post: %s", e)
             return False
     
+    def _forget_post(self, post_id: str) -> None:
+        """Drop cached status for a post under every token"""
+        with self._read_cache_lock:
+            for key in [key for key in self._status_cache if key[1] == post_id]:
+                self._status_cache.pop(key, None)
+    
     def get_post_status(self, access_token: str, post_id: str) -> Dict[str, Any]:
         """
         Get Facebook post status and metrics
@@ -215,30 +253,28 @@ class FacebookPublisher(BasePublisher):
         Returns:
             Post metrics and status
         """
+        cache_key = (self._token_key(access_token), post_id, POST_STATUS_FIELDS)
+        with self._read_cache_lock:
+            cached = self._status_cache.get(cache_key)
+        if cached is not None:
+            return dict(cached)
+        
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.graph_api_url}/{post_id}",
                 params={
-                    'fields': 'id,message,created_time,permalink_url,likes.summary(true),comments.summary(true),shares',
+                    'fields': POST_STATUS_FIELDS,
                     'access_token': access_token
                 },
                 timeout=30
             )
             response.raise_for_status()
-            data = response.json()
-            
-            return {
-                'post_id': data.get('id'),
-                'url': data.get('permalink_url'),
-                'message': data.get('message'),
-                'created_time': data.get('created_time'),
-                'likes': data.get('likes', {}).get('summary', {}).get('total_count', 0),
-                'comments': data.get('comments', {}).get('summary', {}).get('total_count', 0),
-                'shares': data.get('shares', {}).get('count', 0),
-                'status': 'published'
-            }
+            status = self._parse_post_status(json_fast.loads(response.content))
+            with self._read_cache_lock:
+                self._status_cache[cache_key] = status
+            return dict(status)
         except Exception as e:
-            logger.error(f"Failed to get Facebook post status: {e}")
+            logger.error("Failed to get Facebook post status: %s", e)
             return {
                 'post_id': post_id,
                 'status': 'unknown',
@@ -263,32 +299,31 @@ class FacebookPublisher(BasePublisher):
             Page insights data
         """
         if not metrics:
-            metrics = [
-                'page_impressions',
-                'page_engaged_users',
-                'page_post_engagements',
-                'page_fans'
-            ]
+            metrics = DEFAULT_PAGE_METRICS
+        
+        metric = ','.join(metrics)
+        cache_key = (self._token_key(access_token), page_id, metric)
+        with self._read_cache_lock:
+            cached = self._insights_cache.get(cache_key)
+        if cached is not None:
+            return dict(cached)
         
         try:
-            response = requests.get(
-                f"{self.graph_api_url}/{page_id}/insights",
+            response = self.session.get(
+                graph_endpoint(page_id, 'insights'),
                 params={
-                    'metric': ','.join(metrics),
+                    'metric': metric,
                     'access_token': access_token
                 },
                 timeout=30
             )
             response.raise_for_status()
-            data = response.json()
-            
-            insights = {}
-            for item in data.get('data', []):
-                insights[item['name']] = item['values'][0]['value']
-            
-            return insights
+            insights = self._parse_insights(json_fast.loads(response.content))
+            with self._read_cache_lock:
+                self._insights_cache[cache_key] = insights
+            return dict(insights)
         except Exception as e:
-            logger.error(f"Failed to get Facebook page insights: {e}")
+            logger.error("Failed to get Facebook page insights: %s", e)
             return {}
     
     def get_page_info(self, access_token: str, page_id: str) -> Dict[str, Any]:
@@ -303,19 +338,41 @@ class FacebookPublisher(BasePublisher):
             Page information
         """
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.graph_api_url}/{page_id}",
                 params={
-                    'fields': 'id,name,username,category,fan_count,link',
+                    'fields': PAGE_INFO_FIELDS,
                     'access_token': access_token
                 },
                 timeout=30
             )
             response.raise_for_status()
-            return response.json()
+            return json_fast.loads(response.content)
         except Exception as e:
-            logger.error(f"Failed to get Facebook page info: {e}")
+            logger.error("Failed to get Facebook page info: %s", e)
             return {}
+    
+    @staticmethod
+    def _parse_post_status(data: Dict[str, Any]) -> Dict[str, Any]:
+        """Shape a post object fetched with POST_STATUS_FIELDS"""
+        return {
+            'post_id': data.get('id'),
+            'url': data.get('permalink_url'),
+            'message': data.get('message'),
+            'created_time': data.get('created_time'),
+            'likes': data.get('likes', {}).get('summary', {}).get('total_count', 0),
+            'comments': data.get('comments', {}).get('summary', {}).get('total_count', 0),
+            'shares': data.get('shares', {}).get('count', 0),
+            'status': 'published'
+        }
+    
+    @staticmethod
+    def _parse_insights(data: Dict[str, Any]) -> Dict[str, Any]:
+        """Flatten an insights response to {metric: latest value}"""
+        insights = {}
+        for item in data.get('data', []):
+            insights[item['name']] = item['values'][0]['value']
+        return insights
 
 
 # Global Facebook publisher instance
@@ -0,0 +1,221 @@
+"""
+Shared HTTP session for publishers talking to the Meta Graph API
+"""
+import hashlib
+import logging
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+
+from app.config import settings
+from app.utils import json_fast
+from app.utils.graph_batch import GRAPH_BATCH_LIMIT, batch_form, parse_batch
+from app.utils.http import create_session
+
+logger = logging.getLogger(__name__)
+
+GRAPH_API_URL = "https://graph.facebook.com/v18.0"
+
+# Rolling usage windows decay on their own; re-check a hot token after this long
+USAGE_COOLDOWN_SECONDS = 60
+
+
+@lru_cache(maxsize=4096)
+def graph_endpoint(account_id: str, path: str) -> str:
+    """
+    Graph API URL for an account-level edge (e.g. a page's /feed)
+    
+    Memoized because publishers hit the same few accounts' edges over and over.
+    
+    Args:
+        account_id: Page or Instagram Business Account ID
+        path: Edge name, e.g. "photos" or "media_publish"
+    
+    Returns:
+        Absolute endpoint URL
+    """
+    return f"{GRAPH_API_URL}/{account_id}/{path}"
+
+
+class GraphAPIClient:
+    """
+    requests.Session wrapper that throttles itself from Meta's usage headers
+    
+    Every Graph response carries X-App-Usage and X-Business-Use-Case-Usage with
+    the percentage of the rate-limit budget consumed. Once a token crosses the
+    threshold, further calls with it wait for the window to recover (or fail fast
+    when that would take too long) instead of running into a multi-hour block.
+    """
+    
+    def __init__(
+        self,
+        session: requests.Session,
+        threshold: int = 80,
+        max_wait: float = 5
+    ):
+        self.session = session
+        self.threshold = threshold
+        self.max_wait = max_wait
+        self._usage: Dict[str, Tuple[int, float]] = {}  # token hash -> (usage %, reset_at)
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _token_key(kwargs: Dict[str, Any]) -> Optional[str]:
+        """Hash of the access token carried in a request's params or form body"""
+        for source in (kwargs.get('params'), kwargs.get('data')):
+            # MultipartEncoder bodies keep their form fields on .fields
+            fields = getattr(source, 'fields', source)
+            if isinstance(fields, dict) and fields.get('access_token'):
+                return hashlib.sha256(fields['access_token'].encode()).hexdigest()[:16]
+        return None
+    
+    @staticmethod
+    def _parse_usage(response: requests.Response) -> Tuple[int, float]:
+        """
+        Read the highest usage percentage and recovery time from Graph usage headers
+        
+        Args:
+            response: Graph API response
+        
+        Returns:
+            Tuple of (usage percent, seconds until access is regained)
+        """
+        usage = 0
+        regain_seconds = 0.0
+        
+        app_usage = response.headers.get('X-App-Usage')
+        if app_usage:
+            data = json_fast.loads(app_usage)
+            usage = max(data.get('call_count', 0), data.get('total_cputime', 0), data.get('total_time', 0))
+        
+        buc_usage = response.headers.get('X-Business-Use-Case-Usage')
+        if buc_usage:
+            for entries in json_fast.loads(buc_usage).values():
+                for entry in entries:
+                    usage = max(
+                        usage,
+                        entry.get('call_count', 0),
+                        entry.get('total_cputime', 0),
+                        entry.get('total_time', 0)
+                    )
+                    regain_seconds = max(regain_seconds, entry.get('estimated_time_to_regain_access', 0) * 60)
+        
+        return usage, regain_seconds
+    
+    def _wait_for_budget(self, key: str) -> None:
+        """Sleep until a hot token's window recovers, or raise if that is too far off"""
+        with self._lock:
+            usage, reset_at = self._usage.get(key, (0, 0.0))
+        if usage < self.threshold:
+            return
+        
+        wait = reset_at - time.monotonic()
+        if wait <= 0:
+            return
+        if wait > self.max_wait:
+            raise ValueError(
+                f"Graph API usage at {usage}% for this account; retry in {int(wait) + 1}s"
+            )
+        logger.warning("Graph API usage at %s%%, pausing %.1fs", usage, wait)
+        time.sleep(wait)
+    
+    def _record_usage(self, key: str, response: requests.Response) -> None:
+        """Update the usage entry for a token from a response's headers"""
+        try:
+            usage, regain_seconds = self._parse_usage(response)
+        except (ValueError, AttributeError, TypeError):
+            logger.debug("Unparseable Graph usage headers: %s", response.headers.get('X-App-Usage'))
+            return
+        
+        with self._lock:
+            if usage < self.threshold:
+                self._usage.pop(key, None)
+            else:
+                self._usage[key] = (usage, time.monotonic() + max(regain_seconds, USAGE_COOLDOWN_SECONDS))
+    
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Issue a request through the pooled session, honouring the usage budget
+        
+        Args:
+            method: HTTP method
+            url: Request URL
+            **kwargs: Passed through to requests.Session.request
+        
+        Returns:
+            requests.Response
+        """
+        key = self._token_key(kwargs)
+        if key is None:
+            # Untokened calls (e.g. probing third-party image hosts) aren't metered
+            return self.session.request(method, url, **kwargs)
+        
+        self._wait_for_budget(key)
+        response = self.session.request(method, url, **kwargs)
+        self._record_usage(key, response)
+        return response
+    
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+    
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+    
+    def head(self, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault('allow_redirects', False)
+        return self.request('HEAD', url, **kwargs)
+    
+    def delete(self, url: str, **kwargs) -> requests.Response:
+        return self.request('DELETE', url, **kwargs)
+    
+    def batch(
+        self,
+        access_token: str,
+        subrequests: List[Dict[str, Any]],
+        timeout: float = 30
+    ) -> List[Tuple[Optional[int], Any]]:
+        """
+        Run subrequests through the Graph batch endpoint, GRAPH_BATCH_LIMIT per round trip
+        
+        Subrequests that reference each other must fall in the same batch of 50.
+        
+        Args:
+            access_token: Default token for subrequests that don't carry their own
+            subrequests: Batch entries
+            timeout: Per-request timeout in seconds
+        
+        Returns:
+            List of (status_code, parsed body or None) in request order
+        
+        Raises:
+            requests.HTTPError: If a batch request itself fails
+        """
+        results = []
+        for start in range(0, len(subrequests), GRAPH_BATCH_LIMIT):
+            response = self.post(
+                f"{GRAPH_API_URL}/",
+                data=batch_form(access_token, subrequests[start:start + GRAPH_BATCH_LIMIT]),
+                timeout=timeout
+            )
+            response.raise_for_status()
+            results.extend(parse_batch(response.content))
+        return results
+
+
+# Facebook and Instagram publishers hit the same host, so they share one keep-alive pool.
+# 429s are left to retry_on_rate_limit (which honours Retry-After) rather than retried here too.
+graph_client = GraphAPIClient(
+    create_session(
+        pool_connections=10,
+        pool_maxsize=20,
+        retries=2,
+        backoff_factor=1.0,
+        backoff_jitter=0.5,
+        status_forcelist=(500, 502, 503, 504)
+    ),
+    threshold=settings.GRAPH_USAGE_THRESHOLD,
+    max_wait=settings.GRAPH_USAGE_MAX_WAIT_SECONDS
+)
@@ -2,24 +2,52 @@
 Instagram Publisher - handles posting to Instagram via Graph API
 """
 import requests
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 import logging
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+from cachetools import TTLCache
 
 from app.publishers.base_publisher import BasePublisher
+from app.publishers.graph_client import GRAPH_API_URL, graph_client, graph_endpoint
 from app.utils.temp_image_storage import temp_image_storage
+from app.utils import json_fast
+from app.utils.http import create_session
+from app.utils.retry import retry_on_rate_limit
 from app.utils.cloudinary_uploader import create_cloudinary_uploader
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Image hosts are third parties: probe them without the Graph usage governor or retries
+_probe_session = create_session(pool_maxsize=10, retries=0)
+
+# Hosts Instagram's crawler is known to fetch reliably; no pre-publish probe needed
+_KNOWN_GOOD_HOSTS = frozenset({'res.cloudinary.com'})
+
+# Accessibility probes run alongside the container POST rather than ahead of it
+VERIFY_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="ig-verify")
+
+POST_STATUS_FIELDS = 'id,media_type,media_url,permalink,caption,timestamp,like_count,comments_count'
+INSIGHT_METRICS = 'engagement,impressions,reach,saved'
+
 
 class InstagramPublisher(BasePublisher):
     """Publisher for Instagram using Meta Graph API"""
     
     def __init__(self):
         super().__init__('instagram')
-        self.graph_api_url = "https://graph.facebook.com/v18.0"
+        self.graph_api_url = GRAPH_API_URL
+        self.session = graph_client  # Pooled, usage-governed connections to graph.facebook.com
+        # token hash -> Instagram Business Account ID; stable for the life of a token
+        self._account_id_cache = TTLCache(maxsize=1024, ttl=3600)
+        self._account_id_lock = threading.Lock()
+        # Read-side results for polling dashboards, keyed by (token hash, media ID)
+        self._status_cache = TTLCache(maxsize=10_000, ttl=30)
+        self._insights_cache = TTLCache(maxsize=10_000, ttl=300)
+        self._read_cache_lock = threading.RLock()
     
     def _verify_image_accessibility(self, image_url: str) -> Dict[str, Any]:
         """
@@ -39,53 +67,35 @@ class InstagramPublisher(BasePublisher):
             }
         """
         try:
-            logger.info(f"Verifying image accessibility: {image_url}")
-            
-            import time
-            start_time = time.time()
+            logger.info("Verifying image accessibility: %s", image_url)
             
-            # Make a HEAD request to check if image is accessible
-            # Try with different User-Agents to simulate Instagram's crawler
-            user_agents = [
-                'facebookexternalhit/1.1',  # Instagram/Facebook crawler
-                'Mozilla/5.0 (compatible; InstagramBot/1.0)',
-                'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            ]
+            start_time = time.perf_counter()
             
-            last_response = None
-            for user_agent in user_agents:
-                try:
-                    response = requests.head(
-                        image_url,
-                        timeout=10,
-                        headers={
-                            'User-Agent': user_agent,
-                            'Accept': 'image/*',
-                            'ngrok-skip-browser-warning': 'true'
-                        },
-                        allow_redirects=True
-                    )
-                    last_response = response
-                    
-                    if response.status_code == 200:
-                        break
-                except:
-                    continue
-            
-            if not last_response:
-                return {
-                    'accessible': False,
-                    'error': 'No response from server'
-                }
-            
-            response = last_response
-            response_time = (time.time() - start_time) * 1000
+            # A single zero-byte ranged GET as Instagram's crawler; works on hosts that reject HEAD
+            response = _probe_session.get(
+                image_url,
+                timeout=5,
+                headers={
+                    'User-Agent': 'facebookexternalhit/1.1',
+                    'Accept': 'image/*',
+                    'Range': 'bytes=0-0',
+                    'ngrok-skip-browser-warning': 'true'
+                },
+                stream=True,
+                allow_redirects=True
+            )
+            response.close()
+            response_time = (time.perf_counter() - start_time) * 1000.0
             
             content_type = response.headers.get('Content-Type', '')
             content_length = response.headers.get('Content-Length', 0)
+            # A 206 reply carries the full size after the slash in Content-Range
+            content_range = response.headers.get('Content-Range', '')
+            if '/' in content_range and not content_range.endswith('*'):
+                content_length = content_range.rsplit('/', 1)[1]
             
             result = {
-                'accessible': response.status_code == 200,
+                'accessible': response.status_code in (200, 206),
                 'status_code': response.status_code,
                 'content_type': content_type,
                 'content_length': int(content_length) if content_length else 0,
@@ -94,29 +104,103 @@ class InstagramPublisher(BasePublisher):
                 'redirects': len(response.history)
             }
             
-            logger.info(f"Image accessibility check:")
-            logger.info(f"  - Status: {result['status_code']}")
-            logger.info(f"  - Content-Type: {result['content_type']}")
-            logger.info(f"  - Size: {result['content_length']} bytes")
-            logger.info(f"  - Response time: {result['response_time_ms']:.2f}ms")
-            logger.info(f"  - Redirects: {result['redirects']}")
-            logger.info(f"  - Final URL: {result['final_url']}")
+            logger.info(
+                "Image check: status=%s ct=%s bytes=%s rt=%.2fms redirects=%s final=%s",
+                result['status_code'],
+                result['content_type'],
+                result['content_length'],
+                result['response_time_ms'],
+                result['redirects'],
+                result['final_url']
+            )
             
             # Verify it's an image content type
             if not content_type.startswith('image/'):
-                logger.warning(f"URL does not return image content type: {content_type}")
+                logger.warning("URL does not return image content type: %s", content_type)
                 result['accessible'] = False
                 result['error'] = f"Invalid content type: {content_type}"
             
             return result
                 
         except Exception as e:
-            logger.error(f"Failed to verify image accessibility: {e}")
+            logger.error("Failed to verify image accessibility: %s", e)
             return {
                 'accessible': False,
                 'error': str(e)
             }
     
+    def _log_accessibility(self, image_url: str, accessibility_result: Dict[str, Any]) -> None:
+        """
+        Log the outcome of an image accessibility check
+        
+        Args:
+            image_url: URL that was verified
+            accessibility_result: Result from _verify_image_accessibility
+        """
+        if not accessibility_result.get('accessible', False):
+            error_info = accessibility_result.get('error', 'Unknown error')
+            logger.warning(
+                "Image accessibility verification failed for %s. Error: %s. "
+                "This may cause Instagram API to fail. Detailed info: %s",
+                image_url, error_info, accessibility_result
+            )
+        else:
+            # Image is accessible to us, but may not be to Instagram's crawler
+            logger.info("✅ Image is accessible from our server, but Instagram's crawler may have different access")
+            
+            # Log a warning about potential ImgBB-Instagram compatibility issues
+            if 'ibb.co' in image_url or 'imgbb.com' in image_url:
+                logger.warning(
+                    "⚠️ Using ImgBB as image host. If Instagram rejects the image:\n"
+                    "  - ImgBB may be blocking Instagram's crawler (facebookexternalhit)\n"
+                    "  - Rate limiting may be in effect\n"
+                    "  - Consider using an alternative image host known to work with Instagram\n"
+                    "  - Instagram-compatible hosts: Cloudinary, AWS S3, Azure Blob Storage"
+                )
+    
+    def _upload_to_cloudinary(self, image_data: bytes) -> str:
+        """
+        Upload binary image data to Cloudinary so Instagram can fetch it by URL
+        
+        Args:
+            image_data: Binary image data
+        
+        Returns:
+            Public HTTPS URL of the uploaded image
+        """
+        logger.info("Binary image data provided, uploading to Cloudinary")
+        try:
+            # Check if Cloudinary credentials are configured
+            if not settings.CLOUDINARY_CLOUD_NAME or not settings.CLOUDINARY_API_KEY or not settings.CLOUDINARY_API_SECRET:
+                raise ValueError(
+                    "Cloudinary credentials not configured. Please add CLOUDINARY_CLOUD_NAME, "
+                    "CLOUDINARY_API_KEY, and CLOUDINARY_API_SECRET to your .env file. "
+                    "Instagram requires publicly accessible image URLs."
+                )
+            
+            # Create Cloudinary uploader
+            cloudinary_uploader = create_cloudinary_uploader(
+                settings.CLOUDINARY_CLOUD_NAME,
+                settings.CLOUDINARY_API_KEY,
+                settings.CLOUDINARY_API_SECRET
+            )
+            
+            # Upload image to Cloudinary
+            cloudinary_upload_result = cloudinary_uploader.upload_image(
+                image_data,
+                folder="instagram"
+            )
+            
+            # Use the secure HTTPS URL from Cloudinary
+            # Cloudinary is designed for social media and works reliably with Instagram
+            image_url = cloudinary_upload_result['url']
+            logger.info("Image uploaded to Cloudinary successfully: %s", image_url)
+            return image_url
+            
+        except Exception as e:
+            logger.error("Failed to upload image to Cloudinary: %s", e)
+            raise ValueError(f"Failed to upload image to Cloudinary: {str(e)}")
+    
     def publish_post(
         self,
         access_token: str,
@@ -143,70 +227,21 @@ class InstagramPublisher(BasePublisher):
             dict with post_id and url
         """
         # Handle binary image data by uploading to Cloudinary
-        cloudinary_upload_result = None
-        if image_data and not image_url:
-            logger.info("Binary image data provided, uploading to Cloudinary")
-            try:
-                # Check if Cloudinary credentials are configured
-                if not settings.CLOUDINARY_CLOUD_NAME or not settings.CLOUDINARY_API_KEY or not settings.CLOUDINARY_API_SECRET:
-                    raise ValueError(
-                        "Cloudinary credentials not configured. Please add CLOUDINARY_CLOUD_NAME, "
-                        "CLOUDINARY_API_KEY, and CLOUDINARY_API_SECRET to your .env file. "
-                        "Instagram requires publicly accessible image URLs."
-                    )
-                
-                # Create Cloudinary uploader
-                cloudinary_uploader = create_cloudinary_uploader(
-                    settings.CLOUDINARY_CLOUD_NAME,
-                    settings.CLOUDINARY_API_KEY,
-                    settings.CLOUDINARY_API_SECRET
-                )
-                
-                # Upload image to Cloudinary
-                cloudinary_upload_result = cloudinary_uploader.upload_image(
-                    image_data,
-                    folder="instagram"
-                )
-                
-                # Use the secure HTTPS URL from Cloudinary
-                # Cloudinary is designed for social media and works reliably with Instagram
-                image_url = cloudinary_upload_result['url']
-                logger.info(f"Using Cloudinary HTTPS URL: {image_url}")
-                logger.info(f"Image uploaded to Cloudinary successfully: {image_url}")
-                
-            except Exception as e:
-                logger.error(f"Failed to upload image to Cloudinary: {e}")
-                raise ValueError(f"Failed to upload image to Cloudinary: {str(e)}")
+        uploaded = bool(image_data and not image_url)
+        if uploaded:
+            image_url = self._upload_to_cloudinary(image_data)
         
         if not image_url:
             raise ValueError("Instagram requires an image_url or image_data")
         
-        if not self.validate_image_url(image_url):
+        # URLs we just got back from Cloudinary don't need checking
+        if not uploaded and not self.validate_image_url(image_url):
             raise ValueError(f"Invalid image URL: {image_url}")
         
-        # Verify image accessibility (helps debug issues)
-        accessibility_result = self._verify_image_accessibility(image_url)
-        if not accessibility_result.get('accessible', False):
-            error_info = accessibility_result.get('error', 'Unknown error')
-            logger.warning(
-                f"Image accessibility verification failed for {image_url}. "
-                f"Error: {error_info}. "
-                "This may cause Instagram API to fail. "
-                "Detailed info: " + str(accessibility_result)
-            )
-        else:
-            # Image is accessible to us, but may not be to Instagram's crawler
-            logger.info("✅ Image is accessible from our server, but Instagram's crawler may have different access")
-            
-            # Log a warning about potential ImgBB-Instagram compatibility issues
-            if 'ibb.co' in image_url or 'imgbb.com' in image_url:
-                logger.warning(
-                    "⚠️ Using ImgBB as image host. If Instagram rejects the image:\n"
-                    "  - ImgBB may be blocking Instagram's crawler (facebookexternalhit)\n"
-                    "  - Rate limiting may be in effect\n"
-                    "  - Consider using an alternative image host known to work with Instagram\n"
-                    "  - Instagram-compatible hosts: Cloudinary, AWS S3, Azure Blob Storage"
-                )
+        # Verify image accessibility off the critical path (helps debug issues)
+        verify_future = None
+        if urlparse(image_url).netloc not in _KNOWN_GOOD_HOSTS:
+            verify_future = VERIFY_POOL.submit(self._verify_image_accessibility, image_url)
         
         # Get Instagram Business Account ID
         instagram_user_id = kwargs.get('instagram_user_id')
@@ -215,62 +250,32 @@ class InstagramPublisher(BasePublisher):
         
         try:
             # Step 1: Create media container
-            logger.info(f"Creating Instagram media container for user {instagram_user_id}")
-            logger.info(f"Using image URL: {image_url}")
+            logger.info("Creating Instagram media container for user %s from %s", instagram_user_id, image_url)
             
-            container_response = requests.post(
-                f"{self.graph_api_url}/{instagram_user_id}/media",
-                params={'access_token': access_token},  # Token as query parameter
-                data={
-                    'image_url': image_url,
-                    'caption': caption
-                },
-                timeout=60
-            )
+            container_response = self._create_container(access_token, instagram_user_id, image_url, caption)
             
             # Check for errors before raising
             if container_response.status_code != 200:
                 error_detail = container_response.text
-                logger.error(f"Instagram media container creation failed: {error_detail}")
-                
-                # Check if it's an accessibility issue
-                if 'localhost' in image_url or '127.0.0.1' in image_url:
-                    raise ValueError(
-                        "Instagram cannot access localhost URLs. Please set SERVER_BASE_URL in your .env "
-                        "file to a publicly accessible URL (e.g., using ngrok) or deploy to a public server. "
-                        f"Current URL: {image_url}"
-                    )
-                
-                raise ValueError(f"Instagram API error: {error_detail}")
+                logger.error("Instagram media container creation failed: %s", error_detail)
+                accessibility_result = verify_future.result() if verify_future is not None else None
+                raise self._container_error(image_url, error_detail, accessibility_result)
             
             container_response.raise_for_status()
-            container_data = container_response.json()
+            container_data = json_fast.loads(container_response.content)
             container_id = container_data['id']
             
-            logger.info(f"Media container created: {container_id}")
+            logger.info("Media container created: %s", container_id)
             
             # Wait for media to be processed (Instagram requirement)
-            time.sleep(2)
+            self._wait_container_ready(access_token, container_id)
             
             # Step 2: Publish the container
-            logger.info(f"Publishing Instagram media container {container_id}")
+            logger.info("Publishing Instagram media container %s", container_id)
             
-            publish_response = requests.post(
-                f"{self.graph_api_url}/{instagram_user_id}/media_publish",
-                params={'access_token': access_token},  # Token as query parameter
-                data={
-                    'creation_id': container_id
-                },
-                timeout=60
-            )
-            publish_response.raise_for_status()
-            publish_data = publish_response.json()
-            media_id = publish_data['id']
-            
-            logger.info(f"Instagram post published successfully: {media_id}")
+            media_id, permalink = self._publish_container(access_token, instagram_user_id, container_id)
             
-            # Get post permalink
-            permalink = self._get_post_permalink(access_token, media_id)
+            logger.info("Instagram post published successfully: %s", media_id)
             
             return {
                 'post_id': media_id,
@@ -288,6 +293,115 @@ class InstagramPublisher(BasePublisher):
             logger.error(error_msg)
             raise ValueError(error_msg)
     
+    def _container_error(
+        self,
+        image_url: str,
+        error_detail: str,
+        accessibility_result: Optional[Dict[str, Any]]
+    ) -> ValueError:
+        """
+        Build the error for a failed media container request
+        
+        Args:
+            image_url: Image URL the container was created from
+            error_detail: Graph API error body
+            accessibility_result: Result of the background image check, if one ran
+        
+        Returns:
+            ValueError describing the failure
+        """
+        if accessibility_result is not None:
+            self._log_accessibility(image_url, accessibility_result)
+            if not accessibility_result.get('accessible', False):
+                error_detail += f" (image check: {accessibility_result.get('error', 'not accessible')})"
+        
+        # Check if it's an accessibility issue
+        if 'localhost' in image_url or '127.0.0.1' in image_url:
+            return ValueError(
+                "Instagram cannot access localhost URLs. Please set SERVER_BASE_URL in your .env "
+                "file to a publicly accessible URL (e.g., using ngrok) or deploy to a public server. "
+                f"Current URL: {image_url}"
+            )
+        
+        return ValueError(f"Instagram API error: {error_detail}")
+    
+    @retry_on_rate_limit()
+    def _create_container(
+        self,
+        access_token: str,
+        instagram_user_id: str,
+        image_url: str,
+        caption: str
+    ) -> requests.Response:
+        """
+        Create an Instagram media container, retrying while rate limited
+        
+        Args:
+            access_token: Instagram access token
+            instagram_user_id: Instagram Business Account ID
+            image_url: Public URL of the image
+            caption: Post caption
+        
+        Returns:
+            Container creation response (non-429 errors are left for the caller)
+        """
+        response = self.session.post(
+            graph_endpoint(instagram_user_id, 'media'),
+            params={'access_token': access_token},  # Token as query parameter
+            data={
+                'image_url': image_url,
+                'caption': caption
+            },
+            timeout=60
+        )
+        if response.status_code == 429:
+            response.raise_for_status()
+        return response
+    
+    def _wait_container_ready(
+        self,
+        access_token: str,
+        container_id: str,
+        max_wait: float = 30
+    ) -> None:
+        """
+        Poll a media container until Instagram has finished processing it
+        
+        Args:
+            access_token: Instagram access token
+            container_id: Media container ID
+            max_wait: Maximum seconds to wait before giving up
+        
+        Raises:
+            ValueError: If processing fails, expires, or does not finish in time
+        """
+        delay = 0.2
+        deadline = time.monotonic() + max_wait
+        
+        while True:
+            response = self.session.get(
+                f"{self.graph_api_url}/{container_id}",
+                params={
+                    'fields': 'status_code',
+                    'access_token': access_token
+                },
+                timeout=10
+            )
+            response.raise_for_status()
+            status_code = json_fast.loads(response.content).get('status_code')
+            
+            if status_code == 'FINISHED':
+                return
+            if status_code in ('ERROR', 'EXPIRED'):
+                raise ValueError(f"Instagram media container {container_id} processing failed: {status_code}")
+            
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise ValueError(f"Instagram media container {container_id} not ready after {max_wait}s (status: {status_code})")
+            
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, 2.0)
+    
     def _get_instagram_account_id(self, access_token: str) -> str:
         """
         Get Instagram Business Account ID from Facebook Graph API
@@ -298,10 +412,16 @@ class InstagramPublisher(BasePublisher):
         Returns:
             Instagram Business Account ID
         """
+        token_key = self._token_key(access_token)
+        with self._account_id_lock:
+            ig_account_id = self._account_id_cache.get(token_key)
+        if ig_account_id:
+            return ig_account_id
+        
         try:
             # Use Facebook Graph API to get Instagram Business Account
-            response = requests.get(
-                "https://graph.facebook.com/v18.0/me/accounts",
+            response = self.session.get(
+                f"{self.graph_api_url}/me/accounts",
                 params={
                     'fields': 'instagram_business_account',
                     'access_token': access_token
@@ -309,49 +429,85 @@ class InstagramPublisher(BasePublisher):
                 timeout=30
             )
             response.raise_for_status()
-            data = response.json()
+            data = json_fast.loads(response.content)
             
             # Find first page with Instagram Business Account
             for page in data.get('data', []):
                 if 'instagram_business_account' in page:
                     ig_account_id = page['instagram_business_account']['id']
-                    logger.info(f"Found Instagram Business Account ID: {ig_account_id}")
+                    logger.info("Found Instagram Business Account ID: %s", ig_account_id)
+                    with self._account_id_lock:
+                        self._account_id_cache[token_key] = ig_account_id
                     return ig_account_id
             
             raise ValueError("No Instagram Business Account found. Please connect an Instagram Business Account to your Facebook Page.")
             
         except Exception as e:
-            logger.error(f"Failed to get Instagram account ID: {e}")
+            logger.error("Failed to get Instagram account ID: %s", e)
             if hasattr(e, 'response') and e.response:
-                logger.error(f"Response: {e.response.text}")
+                logger.error("Response: %s", e.response.text)
             raise ValueError("Failed to get Instagram account ID")
     
-    def _get_post_permalink(self, access_token: str, media_id: str) -> str:
+    @retry_on_rate_limit()
+    def _publish_container(
+        self,
+        access_token: str,
+        instagram_user_id: str,
+        container_id: str
+    ) -> Tuple[str, str]:
         """
-        Get permalink URL for Instagram post
+        Publish a media container and fetch the post permalink in one batched Graph call
         
         Args:
             access_token: Instagram access token
-            media_id: Instagram media ID
+            instagram_user_id: Instagram Business Account ID
+            container_id: Media container ID
         
         Returns:
-            Permalink URL
+            Tuple of (media_id, permalink)
         """
-        try:
-            response = requests.get(
-                f"{self.graph_api_url}/{media_id}",
-                params={
-                    'fields': 'permalink',
-                    'access_token': access_token
-                },
-                timeout=30
-            )
-            response.raise_for_status()
-            data = response.json()
-            return data.get('permalink', f'https://www.instagram.com/p/{media_id}/')
-        except Exception as e:
-            logger.warning(f"Failed to get permalink: {e}")
-            return f'https://www.instagram.com/p/{media_id}/'
+        results = self.session.batch(
+            access_token,
+            self._publish_subrequests(instagram_user_id, container_id),
+            timeout=60
+        )
+        return self._parse_publish_results(results)
+    
+    @staticmethod
+    def _publish_subrequests(instagram_user_id: str, container_id: str) -> List[Dict[str, Any]]:
+        """Graph batch entries that publish a container and read back its permalink"""
+        # The second subrequest references the first one's result, so Graph runs them in order.
+        # Graph nulls out referenced results unless told otherwise; we need the publish body for the media ID.
+        return [
+            {
+                'method': 'POST',
+                'name': 'publish',
+                'relative_url': f"{instagram_user_id}/media_publish",
+                'body': f"creation_id={container_id}",
+                'omit_response_on_success': False
+            },
+            {
+                'method': 'GET',
+                'relative_url': '{result=publish:$.id}?fields=id,permalink'
+            }
+        ]
+    
+    @staticmethod
+    def _parse_publish_results(results: List[Tuple[Optional[int], Any]]) -> Tuple[str, str]:
+        """Extract (media_id, permalink) from parsed publish batch results"""
+        (publish_code, publish_body), (permalink_code, permalink_body) = results
+        
+        if publish_code != 200 or not publish_body:
+            raise ValueError(f"Instagram media_publish failed: {publish_body or 'no response'}")
+        media_id = publish_body['id']
+        
+        permalink = None
+        if permalink_code == 200 and permalink_body:
+            permalink = permalink_body.get('permalink')
+        else:
+            logger.warning("Failed to get permalink for Instagram media %s", media_id)
+        
+        return media_id, permalink or f'https://www.instagram.com/p/{media_id}/'
     
     def delete_post(self, access_token: str, post_id: str) -> bool:
         """
@@ -365,18 +521,26 @@ class InstagramPublisher(BasePublisher):
             True if successful
         """
         try:
-            response = requests.delete(
+            response = self.session.delete(
                 f"{self.graph_api_url}/{post_id}",
                 params={'access_token': access_token},
                 timeout=30
             )
             response.raise_for_status()
-            logger.info(f"Instagram post {post_id} deleted successfully")
+            logger.info("Instagram post %s deleted successfully", post_id)
+            self._forget_post(post_id)
             return True
         except Exception as e:
-            logger.error(f"Failed to delete Instagram post: {e}")
+            logger.error("Failed to delete Instagram post: %s", e)
             return False
     
+    def _forget_post(self, post_id: str) -> None:
+        """Drop cached status/insights for a post under every token"""
+        with self._read_cache_lock:
+            for cache in (self._status_cache, self._insights_cache):
+                for key in [key for key in cache if key[1] == post_id]:
+                    cache.pop(key, None)
+    
     def get_post_status(self, access_token: str, post_id: str) -> Dict[str, Any]:
         """
         Get Instagram post status and metrics
@@ -388,19 +552,25 @@ class InstagramPublisher(BasePublisher):
         Returns:
             Post metrics and status
         """
+        cache_key = (self._token_key(access_token), post_id, POST_STATUS_FIELDS)
+        with self._read_cache_lock:
+            cached = self._status_cache.get(cache_key)
+        if cached is not None:
+            return dict(cached)
+        
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.graph_api_url}/{post_id}",
                 params={
-                    'fields': 'id,media_type,media_url,permalink,caption,timestamp,like_count,comments_count',
+                    'fields': POST_STATUS_FIELDS,
                     'access_token': access_token
                 },
                 timeout=30
             )
             response.raise_for_status()
-            data = response.json()
+            data = json_fast.loads(response.content)
             
-            return {
+            status = {
                 'post_id': data.get('id'),
                 'url': data.get('permalink'),
                 'caption': data.get('caption'),
@@ -410,8 +580,11 @@ class InstagramPublisher(BasePublisher):
                 'timestamp': data.get('timestamp'),
                 'status': 'published'
             }
+            with self._read_cache_lock:
+                self._status_cache[cache_key] = status
+            return dict(status)
         except Exception as e:
-            logger.error(f"Failed to get Instagram post status: {e}")
+            logger.error("Failed to get Instagram post status: %s", e)
             return {
                 'post_id': post_id,
                 'status': 'unknown',
@@ -429,25 +602,33 @@ class InstagramPublisher(BasePublisher):
         Returns:
             Post insights data
         """
+        cache_key = (self._token_key(access_token), media_id, INSIGHT_METRICS)
+        with self._read_cache_lock:
+            cached = self._insights_cache.get(cache_key)
+        if cached is not None:
+            return dict(cached)
+        
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.graph_api_url}/{media_id}/insights",
                 params={
-                    'metric': 'engagement,impressions,reach,saved',
+                    'metric': INSIGHT_METRICS,
                     'access_token': access_token
                 },
                 timeout=30
             )
             response.raise_for_status()
-            data = response.json()
+            data = json_fast.loads(response.content)
             
             insights = {}
             for item in data.get('data', []):
                 insights[item['name']] = item['values'][0]['value']
             
-            return insights
+            with self._read_cache_lock:
+                self._insights_cache[cache_key] = insights
+            return dict(insights)
         except Exception as e:
-            logger.error(f"Failed to get Instagram insights: {e}")
+            logger.error("Failed to get Instagram insights: %s", e)
             return {}
     
     def _get_server_base_url(self) -> str:
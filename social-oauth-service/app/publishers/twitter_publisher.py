@@ -4,26 +4,138 @@ Uses v1.1 media upload endpoint with chunked upload support (INIT→APPEND→FIN
 Note: Even with Twitter API v2, media uploads must use the v1.1 endpoint
 Pure requests implementation for full control
 """
-import tweepy
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 import logging
+import io
 import requests
-from requests_oauthlib import OAuth1Session
-from io import BytesIO
+from requests_oauthlib import OAuth1
+from requests_toolbelt.multipart.encoder import MultipartEncoder
 import time
 import math
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from app.publishers.base_publisher import BasePublisher
+from app.utils.http import create_session
+from app.utils import json_fast
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+MEDIA_UPLOAD_URL = "https://upload.twitter.com/1.1/media/upload.json"
+
 # Media upload constants
 CHUNK_SIZE = 5 * 1024 * 1024  # 5MB chunks for chunked upload
 MAX_IMAGE_SIZE = 5 * 1024 * 1024  # 5MB max for simple image upload
 MAX_VIDEO_SIZE = 512 * 1024 * 1024  # 512MB max for video
-MAX_STATUS_CHECKS = 60  # Maximum status checks for video processing
-STATUS_CHECK_INTERVAL = 2  # Seconds between status checks
+MAX_PROCESSING_WAIT_SEC = 600  # Give up waiting on media processing after 10 minutes
+MAX_STATUS_CHECK_INTERVAL = 15  # Longest pause between STATUS checks
+SHUTDOWN_WAIT_SEC = 10  # How long shutdown waits for deferred tweets still running
+
+# Tweets deferred until their media finishes processing are posted from here
+_PROCESSING_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="twitter-media")
+
+# Deferred tweets whose outcome hasn't been recorded yet, by media_id.
+# Whoever removes an entry (the job itself or shutdown) records the result.
+_pending_deferred: Dict[str, Tuple['TwitterPublisher', Optional[int], Optional[int], str]] = {}
+_pending_lock = threading.Lock()
+_shutting_down = threading.Event()
+
+# Processing pipeline Twitter should use for media that isn't a still image
+_MEDIA_CATEGORIES = {
+    'video/mp4': 'tweet_video',
+    'image/gif': 'tweet_gif'
+}
+
+
+def _claim_deferred(media_id: str) -> bool:
+    """Take responsibility for recording a deferred tweet's outcome (False if already taken)"""
+    with _pending_lock:
+        return _pending_deferred.pop(media_id, None) is not None
+
+
+def shutdown_processing_pool(timeout: float = SHUTDOWN_WAIT_SEC):
+    """
+    Stop deferred tweets on application shutdown
+    
+    Queued jobs are cancelled and running ones stop polling; they get up to
+    `timeout` seconds to finish. Anything still unrecorded after that is
+    recorded to post_history as failed.
+    
+    Args:
+        timeout: Seconds to wait for running jobs
+    """
+    _shutting_down.set()
+    _PROCESSING_POOL.shutdown(wait=False, cancel_futures=True)
+    
+    deadline = time.monotonic() + timeout
+    with _pending_lock:
+        running = len(_pending_deferred)
+    while running and time.monotonic() < deadline:
+        time.sleep(0.1)
+        with _pending_lock:
+            running = len(_pending_deferred)
+    
+    with _pending_lock:
+        unfinished = list(_pending_deferred.items())
+        _pending_deferred.clear()
+    for media_id, (publisher, brand_id, scheduled_post_id, caption) in unfinished:
+        logger.warning("Deferred Twitter post for media %s did not finish before shutdown", media_id)
+        if brand_id is not None:
+            publisher.record_publish_result(
+                brand_id,
+                scheduled_post_id,
+                {'error': 'Service shut down before media processing finished', 'caption': caption},
+                False
+            )
+
+
+def _sniff_media_type(data: bytes) -> str:
+    """
+    Detect the media MIME type from the file's magic bytes
+    
+    Args:
+        data: Media bytes
+    
+    Returns:
+        MIME type, 'image/jpeg' when the signature isn't recognized
+    """
+    head = bytes(memoryview(data)[:12])
+    if head.startswith(b'\xff\xd8\xff'):
+        return 'image/jpeg'
+    if head.startswith(b'\x89PNG'):
+        return 'image/png'
+    if head.startswith(b'GIF8'):
+        return 'image/gif'
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'image/webp'
+    if head[4:8] == b'ftyp':
+        return 'video/mp4'
+    return 'image/jpeg'
+
+
+class _MemoryviewReader(io.RawIOBase):
+    """Read-only file over a memoryview, so a chunk streams into the socket without a bytes copy"""
+    
+    def __init__(self, view: memoryview):
+        self._view = view
+        self._pos = 0
+    
+    def __len__(self) -> int:
+        # MultipartEncoder sizes the part as len() - tell() to compute Content-Length
+        return len(self._view)
+    
+    def tell(self) -> int:
+        return self._pos
+    
+    def readable(self) -> bool:
+        return True
+    
+    def readinto(self, buffer) -> int:
+        n = min(len(buffer), len(self._view) - self._pos)
+        buffer[:n] = self._view[self._pos:self._pos + n]
+        self._pos += n
+        return n
 
 
 class TwitterPublisher(BasePublisher):
@@ -32,6 +144,8 @@ class TwitterPublisher(BasePublisher):
     def __init__(self):
         super().__init__('twitter')
         self.api_url = "https://api.twitter.com/2"
+        # Keep-alive pools for api.twitter.com and upload.twitter.com; POSTs aren't replayed on 5xx (retries=0)
+        self.session = create_session(pool_connections=4, pool_maxsize=32, retries=0)
     
     def publish_post(
         self,
@@ -49,15 +163,17 @@ class TwitterPublisher(BasePublisher):
             caption: Tweet text (max 280 characters)
             image_url: URL of image to attach (optional)
             image_data: Binary image data (optional)
-            **kwargs: Additional parameters (oauth1_token, oauth1_token_secret for media uploads)
+            **kwargs: Additional parameters (oauth1_token, oauth1_token_secret for media uploads;
+                defer_processing with brand_id/scheduled_post_id to tweet media that needs
+                processing in the background instead of waiting for it)
         
         Returns:
-            dict with tweet_id and url
+            dict with tweet_id and url, or status 'processing' with a job_id when deferred
         """
         try:
             # Validate caption length
             if len(caption) > 280:
-                logger.warning(f"Tweet caption exceeds 280 characters ({len(caption)}), truncating...")
+                logger.warning("Tweet caption exceeds 280 characters (%d), truncating...", len(caption))
                 caption = caption[:277] + "..."
             
             # Check if we need to upload media
@@ -67,42 +183,44 @@ class TwitterPublisher(BasePublisher):
                 oauth1_token = kwargs.get('oauth1_token')
                 oauth1_token_secret = kwargs.get('oauth1_token_secret')
                 
-                media_id = self._upload_media(
-                    access_token,
+                media_id, processing_info = self._start_media_upload(
                     image_url=image_url,
                     image_data=image_data,
                     oauth1_token=oauth1_token,
                     oauth1_token_secret=oauth1_token_secret
                 )
-            
-            # Create the tweet using Twitter API v2
-            tweet_url = f"{self.api_url}/tweets"
-            
-            headers = {
-                'Authorization': f'Bearer {access_token}',
-                'Content-Type': 'application/json'
-            }
-            
-            payload = {
-                'text': caption
-            }
-            
-            if media_id:
-                payload['media'] = {
-                    'media_ids': [media_id]
-                }
-            
-            response = requests.post(
-                tweet_url,
-                headers=headers,
-                json=payload,
-                timeout=30
-            )
-            
-            response.raise_for_status()
-            data = response.json()
-            
-            tweet_id = data['data']['id']
+                
+                if processing_info:
+                    auth = self._oauth1_auth(oauth1_token, oauth1_token_secret)
+                    if kwargs.get('defer_processing'):
+                        # Don't hold this request while Twitter processes the video; tweet once it's ready
+                        with _pending_lock:
+                            _pending_deferred[media_id] = (
+                                self, kwargs.get('brand_id'), kwargs.get('scheduled_post_id'), caption
+                            )
+                        _PROCESSING_POOL.submit(
+                            self._publish_when_processed,
+                            access_token,
+                            caption,
+                            media_id,
+                            auth,
+                            processing_info,
+                            kwargs.get('brand_id'),
+                            kwargs.get('scheduled_post_id')
+                        )
+                        logger.info(f"Twitter post deferred until media {media_id} finishes processing")
+                        return {
+                            'post_id': None,
+                            'url': None,
+                            'job_id': media_id,
+                            'platform': 'twitter',
+                            'caption': caption,
+                            'image_url': image_url or 'binary_upload',
+                            'status': 'processing'
+                        }
+                    self._await_processing(media_id, auth, processing_info)
+            
+            tweet_id = self._post_tweet(access_token, caption, media_id)
             tweet_url = f"https://twitter.com/i/web/status/{tweet_id}"
             
             logger.info(f"Twitter post published successfully: {tweet_id}")
@@ -128,6 +246,42 @@ class TwitterPublisher(BasePublisher):
             logger.error(error_msg)
             raise ValueError(error_msg)
     
+    def _post_tweet(self, access_token: str, caption: str, media_id: Optional[str] = None) -> str:
+        """
+        Create a tweet using Twitter API v2
+        
+        Args:
+            access_token: Twitter OAuth access token
+            caption: Tweet text
+            media_id: Uploaded media to attach (optional)
+        
+        Returns:
+            Tweet ID
+        """
+        headers = {
+            'Authorization': f'Bearer {access_token}',
+            'Content-Type': 'application/json'
+        }
+        
+        payload = {
+            'text': caption
+        }
+        
+        if media_id:
+            payload['media'] = {
+                'media_ids': [media_id]
+            }
+        
+        response = self.session.post(
+            f"{self.api_url}/tweets",
+            headers=headers,
+            data=json_fast.dumpb(payload),
+            timeout=30
+        )
+        
+        response.raise_for_status()
+        return json_fast.loads(response.content)['data']['id']
+    
     def _upload_media(
         self,
         access_token: str,
@@ -138,7 +292,7 @@ class TwitterPublisher(BasePublisher):
     ) -> str:
         """
         Upload media using Twitter API v1.1 chunked upload with OAuth 1.0a
-        (INIT→APPEND→FINALIZE→STATUS)
+        (INIT→APPEND→FINALIZE→STATUS), waiting for any processing to finish
         
         NOTE: Twitter's v1.1 media upload endpoint REQUIRES OAuth 1.0a authentication.
         OAuth 2.0 Bearer tokens will result in 403 Forbidden errors.
@@ -153,13 +307,45 @@ class TwitterPublisher(BasePublisher):
         Returns:
             media_id string
         """
+        media_id, processing_info = self._start_media_upload(
+            image_url=image_url,
+            image_data=image_data,
+            oauth1_token=oauth1_token,
+            oauth1_token_secret=oauth1_token_secret
+        )
+        if processing_info:
+            self._await_processing(
+                media_id,
+                self._oauth1_auth(oauth1_token, oauth1_token_secret),
+                processing_info
+            )
+        return media_id
+    
+    def _start_media_upload(
+        self,
+        image_url: Optional[str] = None,
+        image_data: Optional[bytes] = None,
+        oauth1_token: Optional[str] = None,
+        oauth1_token_secret: Optional[str] = None
+    ) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """
+        Upload media up to FINALIZE without waiting for Twitter to process it
+        
+        Args:
+            image_url: URL of image (optional)
+            image_data: Binary image data (optional)
+            oauth1_token: OAuth 1.0a access token (required for media upload)
+            oauth1_token_secret: OAuth 1.0a access token secret (required for media upload)
+        
+        Returns:
+            (media_id, processing_info); processing_info is None when the media is ready now
+        """
         try:
             # Get image data if URL is provided
             if image_url and not image_data:
                 logger.info(f"Downloading image from URL: {image_url}")
-                response = requests.get(image_url, timeout=30)
-                response.raise_for_status()
-                image_data = response.content
+                # The URL may point at a video or GIF; the image limit is applied once the type is known
+                image_data = self._fetch_image(image_url, MAX_VIDEO_SIZE)
             
             if not image_data:
                 raise ValueError("No image data provided for media upload")
@@ -175,19 +361,36 @@ class TwitterPublisher(BasePublisher):
                 raise ValueError(error_msg)
             
             total_bytes = len(image_data)
-            media_type = 'image/jpeg'  # Default, could be enhanced to detect actual type
+            media_type = _sniff_media_type(image_data)
             
-            logger.info(f"Starting chunked media upload using v1.1 endpoint with OAuth 1.0a ({total_bytes} bytes)")
+            # Still images are capped at 5MB; only GIFs and videos may go through the larger limit
+            if media_type not in _MEDIA_CATEGORIES and total_bytes > MAX_IMAGE_SIZE:
+                raise ValueError(f"Image too large: {total_bytes} bytes (max {MAX_IMAGE_SIZE})")
             
-            # Create OAuth 1.0a session
-            oauth = OAuth1Session(
-                settings.TWITTER_API_KEY,
-                client_secret=settings.TWITTER_API_SECRET,
-                resource_owner_key=oauth1_token,
-                resource_owner_secret=oauth1_token_secret
-            )
+            # OAuth 1.0a signer, built once and used on the shared session for every step
+            auth = self._oauth1_auth(oauth1_token, oauth1_token_secret)
             
-            upload_url = "https://upload.twitter.com/1.1/media/upload.json"
+            upload_url = MEDIA_UPLOAD_URL
+            
+            # Small images go up in one request; INIT/APPEND/FINALIZE is only needed for large media
+            if total_bytes <= MAX_IMAGE_SIZE and media_type.startswith('image/'):
+                logger.info(f"Simple media upload using v1.1 endpoint with OAuth 1.0a ({total_bytes} bytes)")
+                encoder = MultipartEncoder(fields={
+                    'media': ('media', _MemoryviewReader(memoryview(image_data)), media_type)
+                })
+                response = self.session.post(
+                    upload_url,
+                    auth=auth,
+                    data=encoder,
+                    headers={'Content-Type': encoder.content_type},
+                    timeout=60
+                )
+                response.raise_for_status()
+                media_id = str(json_fast.loads(response.content)['media_id_string'])
+                logger.info(f"✅ Media upload complete - media_id: {media_id}")
+                return media_id, None
+            
+            logger.info(f"Starting chunked media upload using v1.1 endpoint with OAuth 1.0a ({total_bytes} bytes)")
             
             # === STEP 1: INIT ===
             logger.info("Step 1: INIT - Creating upload session")
@@ -197,15 +400,19 @@ class TwitterPublisher(BasePublisher):
                 'total_bytes': total_bytes,
                 'media_type': media_type
             }
+            media_category = _MEDIA_CATEGORIES.get(media_type)
+            if media_category:
+                init_data['media_category'] = media_category
             
-            response = oauth.post(
+            response = self.session.post(
                 upload_url,
+                auth=auth,
                 data=init_data,
                 timeout=30
             )
             
             response.raise_for_status()
-            init_result = response.json()
+            init_result = json_fast.loads(response.content)
             media_id = str(init_result['media_id_string'])
             
             logger.info(f"✓ INIT successful - media_id: {media_id}")
@@ -216,32 +423,26 @@ class TwitterPublisher(BasePublisher):
             num_chunks = math.ceil(total_bytes / CHUNK_SIZE)
             logger.info(f"Uploading {num_chunks} chunk(s)")
             
-            for chunk_index in range(num_chunks):
-                start = chunk_index * CHUNK_SIZE
-                end = min(start + CHUNK_SIZE, total_bytes)
-                chunk = image_data[start:end]
-                
-                logger.info(f"Uploading chunk {chunk_index}/{num_chunks - 1} ({len(chunk)} bytes)")
-                
-                append_data = {
-                    'command': 'APPEND',
-                    'media_id': media_id,
-                    'segment_index': chunk_index
-                }
-                
-                files = {
-                    'media': (f'chunk_{chunk_index}', BytesIO(chunk), 'application/octet-stream')
-                }
-                
-                response = oauth.post(
-                    upload_url,
-                    data=append_data,
-                    files=files,
-                    timeout=60
-                )
+            view = memoryview(image_data)  # Segments are views into this, not copies
+            if num_chunks == 1:
+                self._append_chunk(auth, upload_url, media_id, 0, view)
+            else:
+                # Segments may arrive in any order; the signer keeps no per-request state, so workers share it
+                def upload_segment(chunk_index: int) -> None:
+                    start = chunk_index * CHUNK_SIZE
+                    chunk = view[start:start + CHUNK_SIZE]
+                    self._append_chunk(auth, upload_url, media_id, chunk_index, chunk)
                 
-                response.raise_for_status()
-                logger.info(f"✓ Chunk {chunk_index} uploaded")
+                workers = min(settings.TWITTER_APPEND_PARALLELISM or 1, num_chunks)
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="twitter-append") as pool:
+                    futures = [pool.submit(upload_segment, chunk_index) for chunk_index in range(num_chunks)]
+                    try:
+                        for future in as_completed(futures):
+                            future.result()
+                    except Exception:
+                        for future in futures:
+                            future.cancel()
+                        raise
             
             logger.info("✓ APPEND complete - all chunks uploaded")
             
@@ -253,63 +454,25 @@ class TwitterPublisher(BasePublisher):
                 'media_id': media_id
             }
             
-            response = oauth.post(
+            response = self.session.post(
                 upload_url,
+                auth=auth,
                 data=finalize_data,
                 timeout=30
             )
             
             response.raise_for_status()
-            finalize_result = response.json()
+            finalize_result = json_fast.loads(response.content)
             
             logger.info("✓ FINALIZE successful")
             
-            # === STEP 4: STATUS (if processing required) ===
             processing_info = finalize_result.get('processing_info')
-            
             if processing_info:
-                state = processing_info.get('state')
-                logger.info(f"Step 4: STATUS - Media processing required (state: {state})")
-                
-                # Poll for processing completion
-                check_count = 0
-                while state in ['pending', 'in_progress'] and check_count < MAX_STATUS_CHECKS:
-                    check_after_secs = processing_info.get('check_after_secs', STATUS_CHECK_INTERVAL)
-                    logger.info(f"Waiting {check_after_secs}s for processing... (check {check_count + 1}/{MAX_STATUS_CHECKS})")
-                    
-                    time.sleep(check_after_secs)
-                    
-                    # Check status
-                    status_params = {
-                        'command': 'STATUS',
-                        'media_id': media_id
-                    }
-                    
-                    response = oauth.get(
-                        upload_url,
-                        params=status_params,
-                        timeout=30
-                    )
-                    
-                    response.raise_for_status()
-                    status_result = response.json()
-                    processing_info = status_result.get('processing_info', {})
-                    state = processing_info.get('state')
-                    
-                    check_count += 1
-                
-                if state == 'succeeded':
-                    logger.info("✓ STATUS check complete - media processing succeeded")
-                elif state == 'failed':
-                    error = processing_info.get('error', {})
-                    raise ValueError(f"Media processing failed: {error}")
-                else:
-                    logger.warning(f"Media processing state unclear: {state}")
+                logger.info(f"Media processing required (state: {processing_info.get('state')})")
             else:
                 logger.info("No processing required (image ready immediately)")
-            
-            logger.info(f"✅ Media upload complete - media_id: {media_id}")
-            return media_id
+                logger.info(f"✅ Media upload complete - media_id: {media_id}")
+            return media_id, processing_info
             
         except requests.exceptions.RequestException as e:
             error_msg = f"Failed to upload media to Twitter: {str(e)}"
@@ -323,6 +486,185 @@ class TwitterPublisher(BasePublisher):
             logger.error(error_msg)
             raise ValueError(error_msg)
     
+    def _await_processing(self, media_id: str, auth: OAuth1, processing_info: Dict[str, Any]) -> None:
+        """
+        Poll STATUS until Twitter finishes processing uploaded media
+        
+        Args:
+            media_id: Media ID from INIT
+            auth: OAuth 1.0a signer
+            processing_info: processing_info from the FINALIZE response
+        
+        Raises:
+            ValueError: If processing fails or a STATUS request errors
+        """
+        state = processing_info.get('state')
+        logger.info(f"Step 4: STATUS - Media processing required (state: {state})")
+        
+        try:
+            # Poll for processing completion: honour check_after_secs, else back off 1.5x up to 15s
+            deadline = time.monotonic() + MAX_PROCESSING_WAIT_SEC
+            interval = processing_info.get('check_after_secs') or 1
+            check_count = 0
+            while state in ['pending', 'in_progress']:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                
+                check_count += 1
+                wait = min(interval, remaining)
+                logger.info(f"Waiting {wait:.1f}s for processing... (check {check_count})")
+                if _shutting_down.wait(wait):
+                    raise ValueError("Service shutting down before media processing finished")
+                
+                # Check status
+                status_params = {
+                    'command': 'STATUS',
+                    'media_id': media_id
+                }
+                
+                response = self.session.get(
+                    MEDIA_UPLOAD_URL,
+                    auth=auth,
+                    params=status_params,
+                    timeout=30
+                )
+                
+                response.raise_for_status()
+                status_result = json_fast.loads(response.content)
+                processing_info = status_result.get('processing_info', {})
+                state = processing_info.get('state')
+                
+                interval = max(processing_info.get('check_after_secs', interval * 1.5), 0.5)
+                interval = min(interval, MAX_STATUS_CHECK_INTERVAL)
+        except requests.exceptions.RequestException as e:
+            error_msg = f"Failed to check Twitter media status: {str(e)}"
+            logger.error(error_msg)
+            raise ValueError(error_msg)
+        
+        if state == 'succeeded':
+            logger.info("✓ STATUS check complete - media processing succeeded")
+        elif state == 'failed':
+            error = processing_info.get('error', {})
+            raise ValueError(f"Media processing failed: {error}")
+        else:
+            logger.warning(f"Media processing state unclear: {state}")
+        
+        logger.info(f"✅ Media upload complete - media_id: {media_id}")
+    
+    def _publish_when_processed(
+        self,
+        access_token: str,
+        caption: str,
+        media_id: str,
+        auth: OAuth1,
+        processing_info: Dict[str, Any],
+        brand_id: Optional[int],
+        scheduled_post_id: Optional[int]
+    ) -> None:
+        """
+        Background half of a deferred publish: wait for media processing, then tweet
+        
+        The outcome is recorded to post_history, since the caller has already returned.
+        
+        Args:
+            access_token: Twitter OAuth access token
+            caption: Tweet text
+            media_id: Media ID still being processed
+            auth: OAuth 1.0a signer
+            processing_info: processing_info from the FINALIZE response
+            brand_id: Brand to record the result against (nothing is recorded if None)
+            scheduled_post_id: Scheduled post ID (if applicable)
+        """
+        try:
+            self._await_processing(media_id, auth, processing_info)
+            tweet_id = self._post_tweet(access_token, caption, media_id)
+            result = {
+                'post_id': tweet_id,
+                'url': f"https://twitter.com/i/web/status/{tweet_id}",
+                'caption': caption
+            }
+            success = True
+            logger.info(f"Deferred Twitter post published successfully: {tweet_id}")
+        except Exception as e:
+            result = {'error': str(e), 'caption': caption}
+            success = False
+            logger.error(f"Deferred Twitter post for media {media_id} failed: {e}")
+        
+        if _claim_deferred(media_id) and brand_id is not None:
+            self.record_publish_result(brand_id, scheduled_post_id, result, success)
+    
+    @staticmethod
+    def _oauth1_auth(oauth1_token: str, oauth1_token_secret: str) -> OAuth1:
+        """OAuth 1.0a request signer for the v1.1 media upload endpoint"""
+        return OAuth1(
+            settings.TWITTER_API_KEY,
+            client_secret=settings.TWITTER_API_SECRET,
+            resource_owner_key=oauth1_token,
+            resource_owner_secret=oauth1_token_secret,
+            signature_type='auth_header'
+        )
+    
+    def _append_chunk(
+        self,
+        auth: OAuth1,
+        upload_url: str,
+        media_id: str,
+        chunk_index: int,
+        chunk: memoryview
+    ) -> None:
+        """
+        Upload one APPEND segment of a chunked media upload
+        
+        Args:
+            auth: OAuth 1.0a signer
+            upload_url: v1.1 media upload endpoint
+            media_id: Media ID from INIT
+            chunk_index: Segment index
+            chunk: View of the segment bytes
+        """
+        logger.info(f"Uploading chunk {chunk_index} ({len(chunk)} bytes)")
+        
+        # Streamed multipart body; OAuth 1.0a signs only the URL and headers for multipart requests
+        encoder = MultipartEncoder(fields={
+            'command': 'APPEND',
+            'media_id': media_id,
+            'segment_index': str(chunk_index),
+            'media': (f'chunk_{chunk_index}', _MemoryviewReader(chunk), 'application/octet-stream')
+        })
+        
+        response = self.session.post(
+            upload_url,
+            auth=auth,
+            data=encoder,
+            headers={'Content-Type': encoder.content_type},
+            timeout=60
+        )
+        
+        response.raise_for_status()
+        logger.info(f"✓ Chunk {chunk_index} uploaded")
+    
+    def _get(self, access_token: str, path: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        GET a v2 endpoint on the shared session
+        
+        Args:
+            access_token: Twitter OAuth access token
+            path: Path under the v2 API, e.g. '/tweets/123'
+            params: Query parameters
+        
+        Returns:
+            Parsed JSON response
+        """
+        response = self.session.get(
+            f"{self.api_url}{path}",
+            headers={'Authorization': f'Bearer {access_token}'},
+            params=params,
+            timeout=30
+        )
+        response.raise_for_status()
+        return json_fast.loads(response.content)
+    
     def delete_post(self, access_token: str, post_id: str) -> bool:
         """
         Delete a tweet
@@ -335,11 +677,15 @@ class TwitterPublisher(BasePublisher):
             True if successful
         """
         try:
-            client = self._create_client(access_token)
-            client.delete_tweet(post_id)
+            response = self.session.delete(
+                f"{self.api_url}/tweets/{post_id}",
+                headers={'Authorization': f'Bearer {access_token}'},
+                timeout=30
+            )
+            response.raise_for_status()
             logger.info(f"Twitter post {post_id} deleted successfully")
             return True
-        except tweepy.TweepyException as e:
+        except requests.exceptions.RequestException as e:
             logger.error(f"Failed to delete Twitter post: {e}")
             return False
     
@@ -355,23 +701,18 @@ class TwitterPublisher(BasePublisher):
             Tweet metrics and status
         """
         try:
-            client = self._create_client(access_token)
-            
             # Get tweet with public metrics
-            tweet = client.get_tweet(
-                post_id,
-                tweet_fields=['created_at', 'public_metrics', 'text'],
-                expansions=['author_id']
-            )
-            
-            tweet_data = tweet.data
-            metrics = tweet_data.public_metrics or {}
+            tweet_data = self._get(access_token, f"/tweets/{post_id}", {
+                'tweet.fields': 'created_at,public_metrics,text',
+                'expansions': 'author_id'
+            })['data']
+            metrics = tweet_data.get('public_metrics') or {}
             
             return {
-                'post_id': tweet_data.id,
-                'url': f"https://twitter.com/i/web/status/{tweet_data.id}",
-                'text': tweet_data.text,
-                'created_at': str(tweet_data.created_at) if tweet_data.created_at else None,
+                'post_id': tweet_data['id'],
+                'url': f"https://twitter.com/i/web/status/{tweet_data['id']}",
+                'text': tweet_data.get('text'),
+                'created_at': tweet_data.get('created_at'),
                 'retweets': metrics.get('retweet_count', 0),
                 'likes': metrics.get('like_count', 0),
                 'replies': metrics.get('reply_count', 0),
@@ -379,7 +720,7 @@ class TwitterPublisher(BasePublisher):
                 'impressions': metrics.get('impression_count', 0),
                 'status': 'published'
             }
-        except tweepy.TweepyException as e:
+        except (requests.exceptions.RequestException, KeyError, ValueError) as e:
             logger.error(f"Failed to get Twitter post status: {e}")
             return {
                 'post_id': post_id,
@@ -405,32 +746,28 @@ class TwitterPublisher(BasePublisher):
             List of tweets
         """
         try:
-            client = self._create_client(access_token)
-            
-            tweets = client.get_users_tweets(
-                user_id,
-                max_results=min(max_results, 100),
-                tweet_fields=['created_at', 'public_metrics', 'text']
-            )
+            tweets = self._get(access_token, f"/users/{user_id}/tweets", {
+                'max_results': min(max_results, 100),
+                'tweet.fields': 'created_at,public_metrics,text'
+            })
             
             tweet_list = []
-            if tweets.data:
-                for tweet in tweets.data:
-                    metrics = tweet.public_metrics or {}
-                    tweet_list.append({
-                        'id': tweet.id,
-                        'text': tweet.text,
-                        'created_at': str(tweet.created_at) if tweet.created_at else None,
-                        'likes': metrics.get('like_count', 0),
-                        'retweets': metrics.get('retweet_count', 0),
-                        'replies': metrics.get('reply_count', 0)
-                    })
+            for tweet in tweets.get('data', []):
+                metrics = tweet.get('public_metrics') or {}
+                tweet_list.append({
+                    'id': tweet['id'],
+                    'text': tweet.get('text'),
+                    'created_at': tweet.get('created_at'),
+                    'likes': metrics.get('like_count', 0),
+                    'retweets': metrics.get('retweet_count', 0),
+                    'replies': metrics.get('reply_count', 0)
+                })
             
             return {
                 'tweets': tweet_list,
                 'count': len(tweet_list)
             }
-        except tweepy.TweepyException as e:
+        except (requests.exceptions.RequestException, ValueError) as e:
             logger.error(f"Failed to get user tweets: {e}")
             return {
                 'tweets': [],
@@ -456,33 +793,30 @@ class TwitterPublisher(BasePublisher):
             List of matching tweets
         """
         try:
-            client = self._create_client(access_token)
-            
-            tweets = client.search_recent_tweets(
-                query=query,
-                max_results=min(max_results, 100),
-                tweet_fields=['created_at', 'public_metrics', 'author_id']
-            )
+            tweets = self._get(access_token, "/tweets/search/recent", {
+                'query': query,
+                'max_results': min(max_results, 100),
+                'tweet.fields': 'created_at,public_metrics,author_id'
+            })
             
             tweet_list = []
-            if tweets.data:
-                for tweet in tweets.data:
-                    metrics = tweet.public_metrics or {}
-                    tweet_list.append({
-                        'id': tweet.id,
-                        'text': tweet.text,
-                        'author_id': tweet.author_id,
-                        'created_at': str(tweet.created_at) if tweet.created_at else None,
-                        'likes': metrics.get('like_count', 0),
-                        'retweets': metrics.get('retweet_count', 0)
-                    })
+            for tweet in tweets.get('data', []):
+                metrics = tweet.get('public_metrics') or {}
+                tweet_list.append({
+                    'id': tweet['id'],
+                    'text': tweet.get('text'),
+                    'author_id': tweet.get('author_id'),
+                    'created_at': tweet.get('created_at'),
+                    'likes': metrics.get('like_count', 0),
+                    'retweets': metrics.get('retweet_count', 0)
+                })
             
             return {
                 'tweets': tweet_list,
                 'count': len(tweet_list),
                 'query': query
             }
-        except tweepy.TweepyException as e:
+        except (requests.exceptions.RequestException, ValueError) as e:
             logger.error(f"Failed to search tweets: {e}")
             return {
                 'tweets': [],
@@ -0,0 +1,240 @@
+"""
+Periodic database maintenance tasks
+"""
+import asyncio
+import logging
+import threading
+from datetime import datetime
+
+import psycopg2
+
+from app.config import settings
+from app.database import db
+from app.oauth.token_manager import token_manager
+
+logger = logging.getLogger(__name__)
+
+# API key -> last time it was used, flushed to the database in batches
+_api_key_usage = {}
+_api_key_usage_lock = threading.Lock()
+
+# post_history rows waiting to be inserted
+_post_history = []
+_post_history_lock = threading.Lock()
+# Set while post_history_flush_loop runs; otherwise rows are inserted synchronously
+_post_history_flusher_running = False
+
+
+def record_api_key_use(api_key: str):
+    """Remember that an API key was used; persisted by the next flush"""
+    with _api_key_usage_lock:
+        _api_key_usage[api_key] = datetime.now()
+
+
+def flush_api_key_usage() -> int:
+    """
+    Write buffered API key usage timestamps in a single statement
+    
+    Returns:
+        Number of updated keys
+    """
+    global _api_key_usage
+    with _api_key_usage_lock:
+        if not _api_key_usage:
+            return 0
+        pending, _api_key_usage = _api_key_usage, {}
+    
+    try:
+        return db.execute_values(
+            """
+            UPDATE service_api_keys AS k
+            SET last_used_at = v.used_at
+            FROM (VALUES %s) AS v(api_key, used_at)
+            WHERE k.api_key = v.api_key
+            """,
+            list(pending.items()),
+            page_size=1000
+        )
+    except Exception:
+        # Keep the timestamps for the next attempt unless newer ones arrived
+        with _api_key_usage_lock:
+            for api_key, used_at in pending.items():
+                _api_key_usage.setdefault(api_key, used_at)
+        raise
+
+
+def queue_post_history(row: tuple):
+    """
+    Queue a post_history row for the flush loop
+    
+    Outside the app (scheduler runs, scripts) or once the loop has stopped,
+    nothing would flush the queue, so the row is inserted right away instead.
+    """
+    if not _post_history_flusher_running:
+        try:
+            _insert_post_history([row])
+        except Exception as e:
+            logger.error(
+                "Failed to record post history, dropping row (scheduled_post_id=%s, brand_id=%s, platform=%s): %s",
+                row[0], row[1], row[2], e
+            )
+        return
+    with _post_history_lock:
+        _post_history.append(row)
+
+
+def _insert_post_history(rows: list):
+    """Insert post_history rows in a single statement"""
+    db.execute_values(
+        """
+        INSERT INTO post_history (
+            scheduled_post_id, brand_id, platform,
+            platform_post_id, post_url, caption,
+            status, error_message, published_at
+        ) VALUES %s
+        """,
+        rows,
+        page_size=1000
+    )
+
+
+def flush_post_history() -> int:
+    """
+    Insert queued post_history rows in a single statement
+    
+    Returns:
+        Number of inserted rows
+    """
+    global _post_history
+    with _post_history_lock:
+        if not _post_history:
+            return 0
+        pending, _post_history = _post_history, []
+    
+    try:
+        _insert_post_history(pending)
+        return len(pending)
+    except psycopg2.OperationalError:
+        # Database unreachable: put the rows back (ahead of newer ones) for the next attempt
+        with _post_history_lock:
+            _post_history[:0] = pending
+        raise
+    except Exception as e:
+        logger.warning("Post history batch insert failed (%s); inserting %d rows one by one", e, len(pending))
+    
+    # A bad row fails the whole batch; insert individually so only the bad rows are lost
+    inserted = 0
+    for row in pending:
+        try:
+            _insert_post_history([row])
+            inserted += 1
+        except Exception as e:
+            logger.error(
+                "Dropping post history row (scheduled_post_id=%s, brand_id=%s, platform=%s): %s",
+                row[0], row[1], row[2], e
+            )
+    return inserted
+
+
+def cleanup_oauth_states() -> int:
+    """
+    Delete OAuth states that expired more than an hour ago
+    
+    Returns:
+        Number of deleted rows
+    """
+    return db.execute_delete(
+        "DELETE FROM oauth_states WHERE expires_at < CURRENT_TIMESTAMP - INTERVAL '1 hour'"
+    )
+
+
+def refresh_expiring_tokens(providers: dict) -> int:
+    """
+    Refresh every active connection whose token is about to expire
+    
+    Due connections come from one query and the new tokens are written in
+    one statement, so publishing rarely has to refresh inline.
+    
+    Args:
+        providers: Platform name -> OAuth provider
+    
+    Returns:
+        Number of refreshed connections
+    """
+    refreshed = []
+    for brand_id, platform in token_manager.needs_refresh_bulk():
+        provider = providers.get(platform)
+        connection = token_manager.get_connection(brand_id, platform) if provider else None
+        if not connection:
+            continue
+        
+        # Facebook/Instagram exchange the current access token rather than a refresh token
+        refresh_token = connection.get('refresh_token') or connection.get('access_token')
+        if not refresh_token:
+            continue
+        
+        try:
+            token_data = provider.refresh_access_token(refresh_token)
+        except Exception as e:
+            logger.warning("Token refresh failed for brand %s on %s: %s", brand_id, platform, e)
+            token_manager.mark_error(brand_id, platform, str(e))
+            continue
+        
+        refreshed.append((
+            brand_id,
+            platform,
+            token_data['access_token'],
+            token_data.get('refresh_token'),  # Some platforms rotate refresh tokens
+            token_data.get('expires_in', 3600)
+        ))
+    
+    return token_manager.update_tokens_bulk(refreshed)
+
+
+async def oauth_state_gc_loop():
+    """Periodically purge stale OAuth states so state lookups only touch live rows"""
+    while True:
+        await asyncio.sleep(settings.OAUTH_STATE_GC_INTERVAL_SECONDS)
+        try:
+            deleted = await asyncio.to_thread(cleanup_oauth_states)
+            if deleted:
+                logger.info("Purged %d stale OAuth states", deleted)
+        except Exception as e:
+            logger.warning("OAuth state cleanup failed: %s", e)
+
+
+async def api_key_usage_flush_loop():
+    """Periodically persist buffered API key usage"""
+    while True:
+        await asyncio.sleep(settings.API_KEY_USAGE_FLUSH_SECONDS)
+        try:
+            await asyncio.to_thread(flush_api_key_usage)
+        except Exception as e:
+            logger.warning("API key usage flush failed: %s", e)
+
+
+async def token_refresh_loop(providers: dict):
+    """Periodically refresh connections whose tokens are about to expire"""
+    while True:
+        await asyncio.sleep(settings.TOKEN_REFRESH_SWEEP_SECONDS)
+        try:
+            refreshed = await asyncio.to_thread(refresh_expiring_tokens, providers)
+            if refreshed:
+                logger.info("Refreshed tokens for %d connections", refreshed)
+        except Exception as e:
+            logger.warning("Token refresh sweep failed: %s", e)
+
+
+async def post_history_flush_loop():
+    """Persist queued publish results shortly after they are recorded"""
+    global _post_history_flusher_running
+    _post_history_flusher_running = True
+    try:
+        while True:
+            await asyncio.sleep(settings.POST_HISTORY_FLUSH_SECONDS)
+            try:
+                await asyncio.to_thread(flush_post_history)
+            except Exception as e:
+                logger.warning("Post history flush failed: %s", e)
+    finally:
+        _post_history_flusher_running = False
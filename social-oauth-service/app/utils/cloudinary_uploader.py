@@ -4,11 +4,37 @@ Cloudinary Image Uploader - handles uploading images to Cloudinary
 import cloudinary
 import cloudinary.uploader
 import cloudinary.api
+import hashlib
 import logging
+import threading
+import time
+from functools import lru_cache
+from io import BytesIO
 from typing import Dict, Any, Optional
 
+import requests
+from requests_toolbelt.multipart.encoder import MultipartEncoder
+
+from app.config import settings
+from app.utils import json_fast
+from app.utils.http import create_session
+from app.utils.json_fast import log_json
+
 logger = logging.getLogger(__name__)
 
+CLOUDINARY_API_URL = "https://api.cloudinary.com/v1_1"
+
+# Keep-alive pool for direct (SDK-less) uploads
+_session = create_session(pool_maxsize=10)
+
+# Caps concurrent uploads so bursts queue here instead of tripping Cloudinary's rate limit
+_CLOUDINARY_SEM = threading.BoundedSemaphore(settings.CLOUDINARY_MAX_CONCURRENCY or 8)
+UPLOAD_QUEUE_TIMEOUT_SECONDS = 30
+
+# Credentials the process-global SDK config was last set to
+_configured = None
+_config_lock = threading.Lock()
+
 
 class CloudinaryUploader:
     """Manages image uploads to Cloudinary"""
@@ -26,15 +52,19 @@ class CloudinaryUploader:
         self.api_key = api_key
         self.api_secret = api_secret
         
-        # Configure Cloudinary
-        cloudinary.config(
-            cloud_name=cloud_name,
-            api_key=api_key,
-            api_secret=api_secret,
-            secure=True
-        )
-        
-        logger.info(f"Cloudinary configured for cloud: {cloud_name}")
+        # The SDK config is process-global; only touch it when the credentials change
+        global _configured
+        credentials = (cloud_name, api_key, api_secret)
+        with _config_lock:
+            if _configured != credentials:
+                cloudinary.config(
+                    cloud_name=cloud_name,
+                    api_key=api_key,
+                    api_secret=api_secret,
+                    secure=True
+                )
+                _configured = credentials
+                logger.info(f"Cloudinary configured for cloud: {cloud_name}")
     
     def upload_image(
         self, 
@@ -61,24 +91,40 @@ class CloudinaryUploader:
         try:
             logger.info(f"Uploading image to Cloudinary (size: {len(image_data)} bytes)")
             
-            # Upload options
-            upload_options = {
+            # Same options the SDK sends for quality/fetch_format='auto'
+            params = {
                 'folder': folder,
-                'resource_type': resource_type,
-                'quality': 'auto',
-                'fetch_format': 'auto',
+                'timestamp': str(int(time.time())),
+                'transformation': 'f_auto,q_auto',
             }
             
             if public_id:
-                upload_options['public_id'] = public_id
+                params['public_id'] = public_id
             
-            # Upload to Cloudinary
-            result = cloudinary.uploader.upload(
-                image_data,
-                **upload_options
-            )
+            # Stream the multipart body from the caller's buffer instead of copying it
+            encoder = MultipartEncoder(fields={
+                **params,
+                'api_key': self.api_key,
+                'signature': self._sign(params),
+                'file': ('image', BytesIO(image_data), 'application/octet-stream')
+            })
+            if not _CLOUDINARY_SEM.acquire(timeout=UPLOAD_QUEUE_TIMEOUT_SECONDS):
+                raise ValueError("Cloudinary upload queue full")
+            try:
+                response = _session.post(
+                    f"{CLOUDINARY_API_URL}/{self.cloud_name}/{resource_type}/upload",
+                    data=encoder,
+                    headers={'Content-Type': encoder.content_type},
+                    timeout=120
+                )
+            finally:
+                _CLOUDINARY_SEM.release()
+            try:
+                result = json_fast.loads(response.content)
+            except ValueError:
+                result = None  # e.g. an HTML error page from a proxy
             
-            if result and result.get('secure_url'):
+            if response.ok and result and result.get('secure_url'):
                 logger.info(f"Image uploaded successfully to Cloudinary: {result['secure_url']}")
                 
                 return {
@@ -98,12 +144,18 @@ class CloudinaryUploader:
                     'signature': result.get('signature'),
                     'etag': result.get('etag')
                 }
+            elif result and result.get('error'):
+                error_msg = f"Cloudinary API error: {result['error'].get('message')}"
+                logger.error(error_msg)
+                raise ValueError(error_msg)
             else:
                 error_msg = "Cloudinary upload failed - no secure_url in response"
-                logger.error(f"{error_msg}: {result}")
+                logger.error(f"{error_msg}: {log_json(result)}")
                 raise ValueError(error_msg)
                 
-        except cloudinary.exceptions.Error as e:
+        except ValueError:
+            raise
+        except requests.exceptions.RequestException as e:
             error_msg = f"Cloudinary API error: {str(e)}"
             logger.error(error_msg)
             raise ValueError(error_msg)
@@ -112,6 +164,19 @@ class CloudinaryUploader:
             logger.error(error_msg)
             raise ValueError(error_msg)
     
+    def _sign(self, params: Dict[str, str]) -> str:
+        """
+        Cloudinary request signature: SHA-1 of the sorted params plus the API secret
+        
+        Args:
+            params: Upload parameters (excluding file, api_key and resource_type)
+        
+        Returns:
+            Hex signature
+        """
+        to_sign = "&".join(f"{key}={value}" for key, value in sorted(params.items()))
+        return hashlib.sha1((to_sign + self.api_secret).encode()).hexdigest()
+    
     def upload_from_url(
         self, 
         image_url: str,
@@ -146,10 +211,15 @@ class CloudinaryUploader:
                 upload_options['public_id'] = public_id
             
             # Upload to Cloudinary
-            result = cloudinary.uploader.upload(
-                image_url,
-                **upload_options
-            )
+            if not _CLOUDINARY_SEM.acquire(timeout=UPLOAD_QUEUE_TIMEOUT_SECONDS):
+                raise ValueError("Cloudinary upload queue full")
+            try:
+                result = cloudinary.uploader.upload(
+                    image_url,
+                    **upload_options
+                )
+            finally:
+                _CLOUDINARY_SEM.release()
             
             if result and result.get('secure_url'):
                 logger.info(f"Image uploaded successfully to Cloudinary: {result['secure_url']}")
@@ -162,7 +232,7 @@ class CloudinaryUploader:
                 }
             else:
                 error_msg = "Cloudinary upload failed - no secure_url in response"
-                logger.error(f"{error_msg}: {result}")
+                logger.error(f"{error_msg}: {log_json(result)}")
                 raise ValueError(error_msg)
                 
         except cloudinary.exceptions.Error as e:
@@ -191,7 +261,7 @@ class CloudinaryUploader:
                 logger.info(f"Image deleted from Cloudinary: {public_id}")
                 return True
             else:
-                logger.warning(f"Failed to delete image from Cloudinary: {result}")
+                logger.warning(f"Failed to delete image from Cloudinary: {log_json(result)}")
                 return False
                 
         except Exception as e:
@@ -199,10 +269,13 @@ class CloudinaryUploader:
             return False
 
 
+@lru_cache(maxsize=4)
 def create_cloudinary_uploader(cloud_name: str, api_key: str, api_secret: str) -> CloudinaryUploader:
     """
     Factory function to create Cloudinary uploader instance
     
+    Instances are cached per credential set, so repeated callers share one uploader.
+    
     Args:
         cloud_name: Cloudinary cloud name
         api_key: Cloudinary API key
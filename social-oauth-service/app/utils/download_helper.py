@@ -2,19 +2,40 @@
 Download Helper - Similar to Node.js request download utility
 Downloads images from URLs to use with media upload
 """
+import asyncio
+import shutil
+import httpx
 import requests
+import urllib3
 import logging
-from typing import Optional, Callable
+from typing import Optional, Callable, Union
 from pathlib import Path
 
+from app.utils.http import create_async_client, create_session
+
 logger = logging.getLogger(__name__)
 
+# Shared keep-alive pool so repeated downloads from one host skip the TLS handshake
+_session = create_session()
+_aclient = create_async_client()
+
+
+def _save(filename: str, data: Union[bytes, bytearray]) -> None:
+    """Write bytes to filename, creating parent directories as needed"""
+    file_path = Path(filename)
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(filename, 'wb') as f:
+        f.write(data)
+
 
 def download(uri: str, filename: str, callback: Optional[Callable] = None) -> bytes:
     """
     Download a file from a URI and save it to disk
     Similar to the Node.js request download pattern
     
+    The body is streamed straight to disk and then read back once from the
+    page cache, so only one copy of the download is ever held in memory.
+    
     Args:
         uri: URL to download from
         filename: Local filename to save to
@@ -29,20 +50,18 @@ def download(uri: str, filename: str, callback: Optional[Callable] = None) -> by
     try:
         logger.info(f"Downloading from {uri}...")
         
-        # Download the file
-        response = requests.get(uri, timeout=30, stream=True)
-        response.raise_for_status()
+        Path(filename).parent.mkdir(parents=True, exist_ok=True)
         
-        image_data = response.content
-        logger.info(f"Downloaded {len(image_data)} bytes")
+        # Stream the body from the socket to disk
+        with _session.get(uri, timeout=30, stream=True) as response:
+            response.raise_for_status()
+            response.raw.decode_content = True
+            with open(filename, 'wb') as f:
+                shutil.copyfileobj(response.raw, f, length=65536)
         
-        # Save to disk
-        file_path = Path(filename)
-        file_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        with open(filename, 'wb') as f:
-            f.write(image_data)
+        image_data = Path(filename).read_bytes()
         
+        logger.info(f"Downloaded {len(image_data)} bytes")
         logger.info(f"Saved to {filename}")
         
         # Execute callback if provided
@@ -51,7 +70,7 @@ def download(uri: str, filename: str, callback: Optional[Callable] = None) -> by
         
         return image_data
         
-    except requests.exceptions.RequestException as e:
+    except (requests.exceptions.RequestException, urllib3.exceptions.HTTPError) as e:
         logger.error(f"Failed to download {uri}: {e}")
         raise ValueError(f"Download failed: {str(e)}")
     except IOError as e:
@@ -59,7 +78,7 @@ def download(uri: str, filename: str, callback: Optional[Callable] = None) -> by
         raise ValueError(f"File save failed: {str(e)}")
 
 
-async def download_async(uri: str, filename: str, callback: Optional[Callable] = None) -> bytes:
+async def download_async(uri: str, filename: str, callback: Optional[Callable] = None) -> bytearray:
     """
     Async version of download function
     
@@ -69,24 +88,26 @@ async def download_async(uri: str, filename: str, callback: Optional[Callable] =
         callback: Optional async callback function
     
     Returns:
-        Downloaded image data as bytes
+        Downloaded image data (the download buffer itself, so the body is held once)
     """
     try:
         logger.info(f"Downloading (async) from {uri}...")
         
-        # Download the file
-        response = requests.get(uri, timeout=30, stream=True)
-        response.raise_for_status()
-        
-        image_data = response.content
+        # Download the file without blocking the event loop
+        async with _aclient.stream("GET", uri, timeout=30, follow_redirects=True) as response:
+            response.raise_for_status()
+            length = int(response.headers.get('Content-Length') or 0)
+            buf = bytearray(length)
+            offset = 0
+            async for part in response.aiter_bytes(262144):
+                buf[offset:offset + len(part)] = part
+                offset += len(part)
+            del buf[offset:]
+        image_data = buf
         logger.info(f"Downloaded {len(image_data)} bytes")
         
-        # Save to disk
-        file_path = Path(filename)
-        file_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        with open(filename, 'wb') as f:
-            f.write(image_data)
+        # Save to disk off the event loop
+        await asyncio.to_thread(_save, filename, image_data)
         
         logger.info(f"Saved to {filename}")
         
@@ -100,7 +121,7 @@ async def download_async(uri: str, filename: str, callback: Optional[Callable] =
         
         return image_data
         
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         logger.error(f"Failed to download {uri}: {e}")
         raise ValueError(f"Download failed: {str(e)}")
     except IOError as e:
@@ -0,0 +1,58 @@
+"""
+Graph API batch request encoding and parsing, shared by OAuth providers and publishers
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.utils import json_fast
+
+# Graph API caps a batch request at 50 subrequests
+GRAPH_BATCH_LIMIT = 50
+
+
+def batch_form(access_token: str, subrequests: List[Dict[str, Any]]) -> Dict[str, str]:
+    """
+    Form body for a Graph API batch request
+    
+    A subrequest whose result a later one references with {result=name:$...}
+    is returned as null unless it sets 'omit_response_on_success': False.
+    
+    Args:
+        access_token: Default token for subrequests that don't carry their own
+        subrequests: Batch entries ({'method', 'relative_url', optional 'name'/'body'/...})
+    
+    Returns:
+        Form fields to POST to the Graph API root
+    """
+    return {
+        'access_token': access_token,
+        'batch': json_fast.dumps(subrequests),
+        'include_headers': 'false'
+    }
+
+
+def parse_batch(content: bytes) -> List[Tuple[Optional[int], Any]]:
+    """
+    Parse a Graph API batch response body
+    
+    Subrequests Graph left out (referenced results, server-side timeouts)
+    come back as null and are returned as (None, None).
+    
+    Args:
+        content: Batch response body
+    
+    Returns:
+        List of (status_code, parsed body or None) in request order
+    """
+    results = []
+    for item in json_fast.loads(content):
+        if not item:
+            results.append((None, None))
+            continue
+        body = item.get('body')
+        results.append((item.get('code'), json_fast.loads(body) if body else None))
+    return results
+
+
+def get_subrequests(relative_urls: List[str]) -> List[Dict[str, Any]]:
+    """Batch entries for plain GETs of the given relative URLs"""
+    return [{'method': 'GET', 'relative_url': url} for url in relative_urls]
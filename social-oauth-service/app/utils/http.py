@@ -0,0 +1,104 @@
+"""
+Shared HTTP sessions/clients with connection pooling and transient-error retries
+"""
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+def create_session(
+    pool_connections: int = 10,
+    pool_maxsize: int = 20,
+    retries: int = 2,
+    backoff_factor: float = 0.2,
+    backoff_jitter: float = 0.0,
+    status_forcelist: tuple = (429, 500, 502, 503, 504)
+) -> requests.Session:
+    """
+    Create a requests session that keeps connections alive between calls
+    
+    Args:
+        pool_connections: Number of host pools to cache
+        pool_maxsize: Maximum connections kept per host
+        retries: Retries for connection errors and status_forcelist responses
+        backoff_factor: Backoff factor between retries
+        backoff_jitter: Random seconds (0..jitter) added to each backoff so clients don't retry in lockstep
+        status_forcelist: Response statuses retried at the transport level
+    
+    Returns:
+        Configured requests.Session
+    """
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff_factor,
+        backoff_jitter=backoff_jitter,
+        status_forcelist=status_forcelist,
+        raise_on_status=False  # Hand the final response back so callers can inspect it
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=retry
+    )
+    
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def create_client(
+    timeout: float = 30,
+    max_connections: int = 20,
+    max_keepalive_connections: int = 10,
+    retries: int = 2
+) -> httpx.Client:
+    """
+    Create an HTTP/2-capable client so concurrent requests to one host share a connection
+    
+    Args:
+        timeout: Default request timeout in seconds
+        max_connections: Maximum concurrent connections
+        max_keepalive_connections: Maximum idle connections kept open
+        retries: Retries for failed connection attempts
+    
+    Returns:
+        Configured httpx.Client (safe to share between threads)
+    """
+    # Limits and HTTP/2 are transport options once a custom transport is supplied
+    transport = httpx.HTTPTransport(
+        http2=True,
+        retries=retries,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections
+        )
+    )
+    return httpx.Client(timeout=timeout, transport=transport)
+
+
+def create_async_client(
+    timeout: float = 30,
+    max_connections: int = 50,
+    max_keepalive_connections: int = 20
+) -> httpx.AsyncClient:
+    """
+    Create an HTTP/2-capable async client for use from async route handlers
+    
+    Args:
+        timeout: Default request timeout in seconds
+        max_connections: Maximum concurrent connections
+        max_keepalive_connections: Maximum idle connections kept open
+    
+    Returns:
+        Configured httpx.AsyncClient
+    """
+    return httpx.AsyncClient(
+        timeout=timeout,
+        http2=True,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections
+        )
+    )
@@ -2,10 +2,15 @@
 ImgBB Image Uploader - handles uploading images to imgbb.com
 """
 import requests
-import base64
 import logging
 from typing import Dict, Any, Optional
 
+# SIMD base64 (same API as the stdlib module) when installed
+try:
+    import pybase64 as base64
+except ImportError:
+    import base64
+
 logger = logging.getLogger(__name__)
 
 
@@ -0,0 +1,57 @@
+"""
+Fast JSON helpers backed by orjson
+"""
+import orjson
+
+
+def dumps(obj) -> str:
+    """
+    Serialize an object to a JSON string
+    
+    Unlike json.dumps, datetime values are serialized (as RFC 3339 strings).
+    
+    Args:
+        obj: Object to serialize
+    
+    Returns:
+        JSON text
+    """
+    return orjson.dumps(obj).decode()
+
+
+def dumpb(obj) -> bytes:
+    """
+    Serialize an object to UTF-8 JSON bytes, ready to send as a request body
+    
+    Args:
+        obj: Object to serialize
+    
+    Returns:
+        JSON bytes
+    """
+    return orjson.dumps(obj)
+
+
+def loads(data):
+    """
+    Parse JSON text or bytes
+    
+    Raises:
+        orjson.JSONDecodeError: If the input isn't valid JSON (a json.JSONDecodeError subclass)
+    """
+    return orjson.loads(data)
+
+
+def log_json(obj) -> str:
+    """
+    Compact JSON for log messages (never indented)
+    
+    Values orjson can't serialize natively are logged via str().
+    
+    Args:
+        obj: Object to render
+    
+    Returns:
+        JSON text
+    """
+    return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
@@ -2,19 +2,49 @@
 Retry logic with exponential backoff
 """
 import time
+import random
 import logging
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
 from functools import wraps
-from typing import Callable, Any, Type, Tuple
+from typing import Callable, Any, Type, Tuple, Optional
+
+import httpx
+import requests
 
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
 
+def is_transient_error(exc: BaseException) -> bool:
+    """
+    Whether an error (or the error it was raised from) is worth retrying
+    
+    Connection failures, timeouts and 429/5xx HTTP responses are transient;
+    everything else (bad input, 4xx responses) fails fast. Publishers wrap
+    request errors in ValueError, so the exception chain is checked too.
+    """
+    while exc is not None:
+        if isinstance(exc, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+            return True
+        if isinstance(exc, requests.exceptions.HTTPError) and exc.response is not None:
+            status = exc.response.status_code
+            return status == 429 or status >= 500
+        if isinstance(exc, httpx.TransportError):
+            return True
+        if isinstance(exc, httpx.HTTPStatusError):
+            status = exc.response.status_code
+            return status == 429 or status >= 500
+        exc = exc.__cause__ or exc.__context__
+    return False
+
+
 def retry_with_backoff(
     max_retries: int = None,
     backoff_seconds: int = None,
-    exceptions: Tuple[Type[Exception], ...] = (Exception,)
+    exceptions: Tuple[Type[Exception], ...] = (Exception,),
+    retry_if: Optional[Callable[[Exception], bool]] = None
 ):
     """
     Decorator to retry a function with exponential backoff
@@ -23,6 +53,7 @@ def retry_with_backoff(
         max_retries: Maximum number of retry attempts (defaults to settings)
         backoff_seconds: Initial backoff time in seconds (defaults to settings)
         exceptions: Tuple of exception types to catch and retry
+        retry_if: Optional predicate; caught errors it rejects are raised immediately
     
     Usage:
         @retry_with_backoff(max_retries=3, backoff_seconds=5)
@@ -35,36 +66,90 @@ def retry_with_backoff(
     if backoff_seconds is None:
         backoff_seconds = settings.RETRY_BACKOFF_SECONDS
     
+    # Sleep before each retry, computed once at decoration time
+    delays = tuple(backoff_seconds * (2 ** i) for i in range(max_retries))
+    
     def decorator(func: Callable) -> Callable:
         @wraps(func)
         def wrapper(*args, **kwargs) -> Any:
-            retry_count = 0
-            current_backoff = backoff_seconds
-            
-            while retry_count <= max_retries:
+            for attempt, delay in enumerate(delays, 1):
                 try:
                     return func(*args, **kwargs)
                 except exceptions as e:
-                    retry_count += 1
-                    
-                    if retry_count > max_retries:
-                        logger.error(
-                            f"Function {func.__name__} failed after {max_retries} retries. "
-                            f"Last error: {str(e)}"
-                        )
+                    if retry_if is not None and not retry_if(e):
                         raise
-                    
                     logger.warning(
-                        f"Function {func.__name__} failed (attempt {retry_count}/{max_retries}). "
-                        f"Retrying in {current_backoff} seconds. Error: {str(e)}"
+                        f"Function {func.__name__} failed (attempt {attempt}/{max_retries}). "
+                        f"Retrying in {delay} seconds. Error: {str(e)}"
                     )
-                    
-                    time.sleep(current_backoff)
-                    # Exponential backoff
-                    current_backoff *= 2
+                    time.sleep(delay)
             
-            # Should never reach here, but just in case
-            raise RuntimeError(f"Unexpected exit from retry loop for {func.__name__}")
+            # Final attempt
+            try:
+                return func(*args, **kwargs)
+            except exceptions as e:
+                if max_retries:
+                    logger.error(
+                        f"Function {func.__name__} failed after {max_retries} retries. "
+                        f"Last error: {str(e)}"
+                    )
+                raise
+        
+        return wrapper
+    return decorator
+
+
+def _retry_after_seconds(response) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date), if present"""
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max((parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def retry_on_rate_limit(
+    max_retries: int = 3,
+    backoff_seconds: float = 1.0,
+    max_delay: float = 60.0
+):
+    """
+    Decorator to retry a call rejected with HTTP 429, honouring Retry-After
+    
+    Only 429 is retried: the server refused the request without acting on it,
+    so replaying a POST cannot duplicate a post. Without a Retry-After header
+    the wait is exponential with full jitter.
+    
+    Args:
+        max_retries: Maximum number of retry attempts
+        backoff_seconds: Base backoff when the response has no Retry-After
+        max_delay: Upper bound on any single wait
+    """
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs) -> Any:
+            for attempt in range(max_retries + 1):
+                try:
+                    return func(*args, **kwargs)
+                except requests.exceptions.HTTPError as e:
+                    response = e.response
+                    if response is None or response.status_code != 429 or attempt == max_retries:
+                        raise
+                    delay = _retry_after_seconds(response)
+                    if delay is None:
+                        delay = random.uniform(0, backoff_seconds * (2 ** attempt))
+                    delay = min(delay, max_delay)
+                    logger.warning(
+                        f"Function {func.__name__} rate limited (attempt {attempt + 1}/{max_retries}). "
+                        f"Retrying in {delay:.1f} seconds"
+                    )
+                    time.sleep(delay)
         
         return wrapper
     return decorator
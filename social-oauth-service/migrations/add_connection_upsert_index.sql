@@ -0,0 +1,5 @@
+-- One connection per brand and platform
+-- TokenManager.save_connection upserts with ON CONFLICT (brand_id, platform), which needs this index
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_social_connections_brand_platform_unique
+ON social_connections(brand_id, platform);
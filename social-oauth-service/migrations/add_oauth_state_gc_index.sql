@@ -0,0 +1,5 @@
+-- Keep OAuth state lookups on a small index of unused states
+-- Stale rows are purged periodically by the service (see app/scheduler/maintenance.py)
+
+CREATE INDEX IF NOT EXISTS idx_oauth_states_live
+ON oauth_states(state_token) WHERE used = false;
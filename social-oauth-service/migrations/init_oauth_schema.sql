@@ -166,6 +166,7 @@ CREATE TABLE IF NOT EXISTS service_api_keys (
 
 -- Create indexes for better query performance
 CREATE INDEX IF NOT EXISTS idx_social_connections_brand_platform ON social_connections(brand_id, platform);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_social_connections_brand_platform_unique ON social_connections(brand_id, platform);
 CREATE INDEX IF NOT EXISTS idx_social_connections_active ON social_connections(is_active);
 CREATE INDEX IF NOT EXISTS idx_scheduled_posts_status ON scheduled_posts(status);
 CREATE INDEX IF NOT EXISTS idx_scheduled_posts_scheduled_time ON scheduled_posts(scheduled_time);
@@ -175,6 +176,7 @@ CREATE INDEX IF NOT EXISTS idx_post_history_brand ON post_history(brand_id);
 CREATE INDEX IF NOT EXISTS idx_webhook_events_processed ON webhook_events(processed);
 CREATE INDEX IF NOT EXISTS idx_oauth_states_token ON oauth_states(state_token);
 CREATE INDEX IF NOT EXISTS idx_oauth_states_expires ON oauth_states(expires_at);
+CREATE INDEX IF NOT EXISTS idx_oauth_states_live ON oauth_states(state_token) WHERE used = false;
 
 -- Create updated_at trigger function
 CREATE OR REPLACE FUNCTION update_updated_at_column()
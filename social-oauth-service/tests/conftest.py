@@ -0,0 +1,7 @@
+"""
+Pytest configuration: make the service's `app` package importable from tests/
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
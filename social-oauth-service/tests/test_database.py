@@ -0,0 +1,93 @@
+"""
+Tests for prepared statement handling in app.database
+"""
+from collections import OrderedDict
+
+import psycopg2.errors
+import pytest
+
+from app.database import Database, _to_positional
+
+
+def test_placeholders_are_numbered_in_order():
+    assert _to_positional("SELECT a FROM t WHERE b = %s AND c = %s") == (
+        "SELECT a FROM t WHERE b = $1 AND c = $2"
+    )
+
+
+def test_escaped_percent_is_unescaped():
+    assert _to_positional("SELECT 10 %% 3, %s") == "SELECT 10 % 3, $1"
+
+
+def test_string_literals_are_left_alone():
+    query = "SELECT a FROM t WHERE b LIKE 'x%%s' AND c = '%s' AND d = 'it''s %s' AND e = %s"
+    assert _to_positional(query) == (
+        "SELECT a FROM t WHERE b LIKE 'x%s' AND c = '%s' AND d = 'it''s %s' AND e = $1"
+    )
+
+
+def test_quoted_identifiers_are_left_alone():
+    assert _to_positional('SELECT "%s" FROM t WHERE a = %s') == 'SELECT "%s" FROM t WHERE a = $1'
+
+
+def test_comments_are_left_alone():
+    query = "SELECT a -- filter on %s\nFROM t /* %s */ WHERE b = %s"
+    assert _to_positional(query) == "SELECT a -- filter on %s\nFROM t /* %s */ WHERE b = $1"
+
+
+class _FakeConnection:
+    """Records statements and fails the first EXECUTE with a stale-plan error"""
+    
+    def __init__(self):
+        self.prepared = OrderedDict()
+        self.statements = []
+        self.rollbacks = 0
+        self.fail_next_execute = True
+    
+    def cursor(self):
+        return _FakeCursor(self)
+    
+    def rollback(self):
+        self.rollbacks += 1
+    
+    def commit(self):
+        pass
+
+
+class _FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+    
+    def execute(self, query, params=None):
+        self.connection.statements.append(query)
+        if query.startswith("EXECUTE") and self.connection.fail_next_execute:
+            self.connection.fail_next_execute = False
+            raise psycopg2.errors.FeatureNotSupported("cached plan must not change result type")
+    
+    def close(self):
+        pass
+
+
+def test_stale_prepared_statement_is_reprepared_once():
+    db = Database()
+    conn = _FakeConnection()
+    query = "SELECT a FROM t WHERE b = %s"
+    name = "tm_stale"
+    conn.prepared[query] = name
+    
+    db._execute(conn.cursor(), query, (1,), prepare=True)
+    
+    assert conn.rollbacks == 1
+    assert "DEALLOCATE ALL" in conn.statements
+    assert conn.statements[-2].startswith("PREPARE ")
+    assert conn.statements[-1].startswith("EXECUTE ")
+    assert list(conn.prepared) == [query]
+
+
+def test_fresh_statement_failure_is_not_retried():
+    db = Database()
+    conn = _FakeConnection()
+    
+    with pytest.raises(psycopg2.errors.FeatureNotSupported):
+        db._execute(conn.cursor(), "SELECT a FROM t WHERE b = %s", (1,), prepare=True)
+    assert conn.rollbacks == 0
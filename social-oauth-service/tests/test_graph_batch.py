@@ -0,0 +1,63 @@
+"""
+Tests for Graph API batch parsing and the batched token exchange
+"""
+from types import SimpleNamespace
+
+import orjson
+import pytest
+
+from app.oauth.meta_provider import MetaGraphOAuthProvider
+from app.utils.graph_batch import batch_form, get_subrequests, parse_batch
+
+
+def _batch_response(*items) -> bytes:
+    """Encode a batch response the way Graph does: each body is a JSON string"""
+    return orjson.dumps([
+        None if item is None else {'code': item[0], 'body': orjson.dumps(item[1]).decode()}
+        for item in items
+    ])
+
+
+def _parse_token_exchange(content: bytes):
+    provider = SimpleNamespace(display_name='Facebook')
+    return MetaGraphOAuthProvider._parse_token_exchange_batch(provider, content)
+
+
+def test_batch_form_encodes_subrequests():
+    form = batch_form('token', get_subrequests(['me?fields=id']))
+    
+    assert form['access_token'] == 'token'
+    assert form['include_headers'] == 'false'
+    assert orjson.loads(form['batch']) == [{'method': 'GET', 'relative_url': 'me?fields=id'}]
+
+
+def test_parse_batch_decodes_bodies_in_order():
+    content = _batch_response((200, {'id': '1'}), (400, {'error': {'message': 'bad'}}))
+    
+    assert parse_batch(content) == [(200, {'id': '1'}), (400, {'error': {'message': 'bad'}})]
+
+
+def test_parse_batch_maps_omitted_results_to_none():
+    assert parse_batch(_batch_response(None, (200, {'id': '2'}))) == [(None, None), (200, {'id': '2'})]
+
+
+def test_parse_batch_handles_missing_body():
+    assert parse_batch(orjson.dumps([{'code': 200}])) == [(200, None)]
+
+
+def test_token_exchange_returns_long_lived_token():
+    content = _batch_response(None, (200, {'access_token': 'long', 'expires_in': 5183944}))
+    
+    assert _parse_token_exchange(content) == {'access_token': 'long', 'expires_in': 5183944}
+
+
+def test_token_exchange_raises_on_failed_subrequest():
+    content = _batch_response((400, {'error': {'message': 'code expired'}}), None)
+    
+    with pytest.raises(ValueError, match='token exchange failed'):
+        _parse_token_exchange(content)
+
+
+def test_token_exchange_raises_without_token():
+    with pytest.raises(ValueError, match='returned no token'):
+        _parse_token_exchange(_batch_response(None, None))
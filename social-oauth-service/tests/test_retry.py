@@ -0,0 +1,82 @@
+"""
+Tests for retry helpers
+"""
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from types import SimpleNamespace
+
+import httpx
+import pytest
+import requests
+
+from app.utils.retry import _retry_after_seconds, is_transient_error
+
+
+def _with_retry_after(value):
+    return SimpleNamespace(headers={'Retry-After': value} if value is not None else {})
+
+
+def _requests_http_error(status: int) -> requests.exceptions.HTTPError:
+    response = requests.Response()
+    response.status_code = status
+    return requests.exceptions.HTTPError(response=response)
+
+
+def _httpx_status_error(status: int) -> httpx.HTTPStatusError:
+    request = httpx.Request('GET', 'https://graph.facebook.com/v18.0/me')
+    return httpx.HTTPStatusError('error', request=request, response=httpx.Response(status, request=request))
+
+
+def test_retry_after_missing():
+    assert _retry_after_seconds(_with_retry_after(None)) is None
+
+
+def test_retry_after_delta_seconds():
+    assert _retry_after_seconds(_with_retry_after('7')) == 7.0
+    assert _retry_after_seconds(_with_retry_after('-3')) == 0.0
+
+
+def test_retry_after_http_date():
+    when = datetime.now(timezone.utc) + timedelta(seconds=30)
+    delay = _retry_after_seconds(_with_retry_after(format_datetime(when, usegmt=True)))
+    assert 25 <= delay <= 30
+
+
+def test_retry_after_past_date_is_zero():
+    when = datetime.now(timezone.utc) - timedelta(minutes=5)
+    assert _retry_after_seconds(_with_retry_after(format_datetime(when, usegmt=True))) == 0.0
+
+
+def test_retry_after_garbage():
+    assert _retry_after_seconds(_with_retry_after('soon')) is None
+
+
+@pytest.mark.parametrize('exc', [
+    requests.exceptions.ConnectionError(),
+    requests.exceptions.Timeout(),
+    _requests_http_error(429),
+    _requests_http_error(503),
+    httpx.ConnectError('refused'),
+    _httpx_status_error(500),
+])
+def test_transient_errors(exc):
+    assert is_transient_error(exc)
+
+
+@pytest.mark.parametrize('exc', [
+    ValueError('bad input'),
+    _requests_http_error(400),
+    _httpx_status_error(404),
+])
+def test_permanent_errors(exc):
+    assert not is_transient_error(exc)
+
+
+def test_wrapped_transient_error_is_found_through_the_chain():
+    try:
+        try:
+            raise requests.exceptions.Timeout()
+        except requests.exceptions.Timeout as e:
+            raise ValueError('Failed to publish') from e
+    except ValueError as wrapped:
+        assert is_transient_error(wrapped)
@@ -0,0 +1,32 @@
+"""
+Tests for Twitter media type detection
+"""
+import pytest
+
+from app.publishers.twitter_publisher import _sniff_media_type
+
+
+@pytest.mark.parametrize('data, expected', [
+    (b'\xff\xd8\xff\xe0\x00\x10JFIF\x00', 'image/jpeg'),
+    (b'\x89PNG\r\n\x1a\n\x00\x00\x00\x0d', 'image/png'),
+    (b'GIF89a\x01\x00\x01\x00\x80\x00', 'image/gif'),
+    (b'RIFF\x24\x00\x00\x00WEBPVP8 ', 'image/webp'),
+    (b'\x00\x00\x00\x18ftypmp42\x00\x00', 'video/mp4'),
+])
+def test_known_signatures(data, expected):
+    assert _sniff_media_type(data) == expected
+
+
+def test_unknown_signature_defaults_to_jpeg():
+    assert _sniff_media_type(b'not an image') == 'image/jpeg'
+
+
+def test_short_and_empty_data():
+    assert _sniff_media_type(b'GIF8') == 'image/gif'
+    assert _sniff_media_type(b'') == 'image/jpeg'
+
+
+def test_accepts_bytearray_and_memoryview():
+    png = b'\x89PNG\r\n\x1a\n' + b'\x00' * 16
+    assert _sniff_media_type(bytearray(png)) == 'image/png'
+    assert _sniff_media_type(memoryview(png)) == 'image/png'